@@ -1,147 +1,189 @@
 import time
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
 from webdriver_manager.chrome import ChromeDriverManager
+import json
 import os
 
-import psutil
+from extract import CONTENT_SELECTORS, extract_article, extract_links, resolve_parser
+from fetcher import Fetcher
+from profiler import run_trials, summarize
+from replay import ReplayServer
 
 folder_path = 'Part01_Result'
+TRIALS = 3  # benchmark repetitions, report median/p95
+SAMPLE_INTERVAL = 0.2  # seconds between resource samples
 
-# CPU testing
-def resource_monitor():
-    return {
-        "cpu_usage": psutil.cpu_percent(interval=1),  # CPU 
-        "memory_usage": psutil.virtual_memory().percent  # RAM
-    }
-
-# time testing
-def benchmark_function(func, *args, **kwargs):
-    start_time = time.time() # time
-    resource_before = resource_monitor()  #  CPU , RAM
-    result, success_rate = func(*args, **kwargs)
-    end_time = time.time()
-    execution_time = end_time - start_time
-    resource_after = resource_monitor()
-    return result, execution_time , resource_before, resource_after, success_rate
+# time + CPU/RAM testing of the scraper's process tree, over repeated trials
+def benchmark_function(func, *args, trials=TRIALS, **kwargs):
+    (result, success_rate), measurements = run_trials(func, *args, trials=trials, interval=SAMPLE_INTERVAL, **kwargs)
+    stats = summarize(measurements)
+    execution_time = stats["wall_time_s"]["median"]
+    return result, execution_time, stats, measurements, success_rate
 
 
 BASE_URL = "https://www.coffeereview.com/category/articles/"
 PAGES_TO_SCRAPE = 2  # scraping pages for test
+PARSER = resolve_parser("lxml")  # html.parser, lxml or html5lib
+RESTRICTED_PARSE = True  # only build the article regions
+SELENIUM_FAST = True  # one script call per page, explicit waits, no images/css/fonts
+# offline, reproducible runs: serve a recorded crawl (python replay.py record) locally
+REPLAY_ARCHIVE = os.environ.get("REPLAY_ARCHIVE")
+REPLAY_PROFILE = os.environ.get("REPLAY_PROFILE", "none")  # none, lan, dsl, 3g
 
 
-##### Approch 01: Selenium
+# one execute_script round trip per page instead of one WebDriver call per field
+LISTING_JS = """
+let items = document.querySelectorAll("article.post");
+if (!items.length) { items = document.querySelectorAll("article"); }
+const links = [];
+for (const item of items) {
+    const a = item.querySelector("h2 a, h1 a, .entry-title a");
+    if (a) { links.push({title: a.innerText.trim(), url: a.href}); }
+}
+return links;
+"""
 
-def scrape_with_selenium():
+ARTICLE_JS = """
+const text = (el) => el ? el.innerText.trim() : null;
+const date = text(document.querySelector(".entry-meta .entry-date, .post-date"));
+const categories = Array.from(document.querySelectorAll(".entry-meta .entry-categories a, .cat-links a"))
+    .map((a) => a.innerText.trim()).join(", ");
+let content = "";
+for (const selector of arguments[0]) {
+    const el = document.querySelector(selector);
+    if (el) {
+        content = el.innerText.trim();
+        if (content) { break; }
+    }
+}
+return {
+    title: text(document.querySelector("h1.entry-title")),
+    date: date,
+    categories: categories,
+    content: content
+};
+"""
 
-    articles = []
-    failure_count=0
-    
+# requests Chrome never needs for text extraction
+BLOCKED_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                "*.css", "*.woff", "*.woff2", "*.ttf", "*.otf"]
+
+WAIT_TIMEOUT = 10
+
+
+def selenium_options(fast):
     options = Options()
     options.add_argument("--headless") 
     options.add_argument("--disable-gpu")
     options.add_argument("--no-sandbox")
     options.add_argument("--window-size=1920x1080")
     options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+    if fast:
+        # return at DOMContentLoaded, the waits below cover the rest
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.stylesheets": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+    return options
+
+
+##### Approch 01: Selenium
+
+def scrape_with_selenium(base_url=BASE_URL, fast=SELENIUM_FAST):
+
+    articles = []
+    failure_count=0
+    
+    options = selenium_options(fast)
     
     # start Selenium
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    if fast:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    wait = WebDriverWait(driver, WAIT_TIMEOUT)
     
     try:
         for page in range(1, PAGES_TO_SCRAPE + 1):
             # URL set, page 1 differ with other pages
             if page == 1:
-                url = BASE_URL
+                url = base_url
             else:
-                url = f"{BASE_URL}page/{page}/"
+                url = f"{base_url}page/{page}/"
             
             print(f"Selenium: Page {page}  - {url}")
             driver.get(url)
-            time.sleep(5)  # page loading
+            if fast:
+                try:
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "article")))
+                except TimeoutException:
+                    pass  # no articles on the page: 0 links, as before
+            else:
+                time.sleep(5)  # page loading
             
             # if loading sucessfully
             print(f"Current URL: {driver.current_url}")
             
-            # scraping the articles
-            article_elements = driver.find_elements(By.CSS_SELECTOR, "article.post")
-            if not article_elements:
-                article_elements = driver.find_elements(By.CSS_SELECTOR, "article")
-            
-            print(f"Getting {len(article_elements)} articles.")
-            
             # storage
             article_links = []
-            for article in article_elements:
-                try:
-                    # title + link
-                    title_element = article.find_element(By.CSS_SELECTOR, "h2 a, h1 a, .entry-title a")
-                    title = title_element.text.strip()
-                    link = title_element.get_attribute("href")
-                    
-                    # store link for scraping article
-                    article_links.append({"title": title, "url": link, "page": page})
-                    print(f"The article : {title}")
-                except Exception as e:
-                    failure_count +=1
-                    print(f"❌ Article Scraping Fail : {e}")
-                    continue
+            if fast:
+                for link in driver.execute_script(LISTING_JS):
+                    article_links.append({"title": link["title"], "url": link["url"], "page": page})
+                    print(f"The article : {link['title']}")
+                print(f"Getting {len(article_links)} articles.")
+            else:
+                # scraping the articles
+                article_elements = driver.find_elements(By.CSS_SELECTOR, "article.post")
+                if not article_elements:
+                    article_elements = driver.find_elements(By.CSS_SELECTOR, "article")
+                
+                print(f"Getting {len(article_elements)} articles.")
+                
+                for article in article_elements:
+                    try:
+                        # title + link
+                        title_element = article.find_element(By.CSS_SELECTOR, "h2 a, h1 a, .entry-title a")
+                        title = title_element.text.strip()
+                        link = title_element.get_attribute("href")
+                        
+                        # store link for scraping article
+                        article_links.append({"title": title, "url": link, "page": page})
+                        print(f"The article : {title}")
+                    except Exception as e:
+                        failure_count +=1
+                        print(f"❌ Article Scraping Fail : {e}")
+                        continue
             
             # connect to the articles
             for article_info in article_links:
                 try:
                     print(f"Reading : {article_info['title']}")
                     driver.get(article_info['url'])
-                    time.sleep(3)  
-                    
-                    # get title
-                    try:
-                        title = driver.find_element(By.CSS_SELECTOR, "h1.entry-title").text.strip()
-                    except:
-                        title = article_info['title']
                     
-                    # get date
-                    try:
-                        date = driver.find_element(By.CSS_SELECTOR, ".entry-meta .entry-date, .post-date").text.strip()
-                    except:
-                        date = "No date available"
-                    
-                    # get catagory
-                    try:
-                        category_elements = driver.find_elements(By.CSS_SELECTOR, ".entry-meta .entry-categories a, .cat-links a")
-                        categories = ", ".join([cat.text.strip() for cat in category_elements])
-                    except:
-                        categories = "No category available"
-                    
-                    # get content
-                    try:
-                        # content container
-                        content_selectors = [
-                            ".entry-content",
-                            ".post-content",
-                            "article .content",
-                            ".post .entry"
-                        ]
-                        
-                        content = ""
-                        for selector in content_selectors:
-                            try:
-                                content_element = driver.find_element(By.CSS_SELECTOR, selector)
-                                content = content_element.text.strip()
-                                if content:
-                                    break
-                            except:
-                                continue
-                        
-                        if not content:
-                            content = "Getting Article Error"
-                    except Exception as e:
-                        print(f"Error: {e}")
-                        content = "Error"
+                    if fast:
+                        try:
+                            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1.entry-title, .entry-content, .post-content")))
+                        except TimeoutException:
+                            pass  # slow or unusual page: extract what is there, with the usual fallbacks
+                        fields = driver.execute_script(ARTICLE_JS, CONTENT_SELECTORS)
+                        title = fields["title"] if fields["title"] is not None else article_info['title']
+                        date = fields["date"] if fields["date"] is not None else "No date available"
+                        categories = fields["categories"]
+                        content = fields["content"] or "Getting Article Error"
+                    else:
+                        time.sleep(3)  
+                        title, date, categories, content = selenium_fields(driver, article_info)
                     
                     # add to list
                     articles.append({
@@ -161,7 +203,8 @@ def scrape_with_selenium():
                     continue
                 
                 # pending
-                time.sleep(2)
+                if not fast:
+                    time.sleep(2)
     finally:
         driver.quit()
     
@@ -171,134 +214,104 @@ def scrape_with_selenium():
     return articles,success_rate
 
 
+# original per-field extraction, one WebDriver call each
+def selenium_fields(driver, article_info):
+    # get title
+    try:
+        title = driver.find_element(By.CSS_SELECTOR, "h1.entry-title").text.strip()
+    except:
+        title = article_info['title']
+    
+    # get date
+    try:
+        date = driver.find_element(By.CSS_SELECTOR, ".entry-meta .entry-date, .post-date").text.strip()
+    except:
+        date = "No date available"
+    
+    # get catagory
+    try:
+        category_elements = driver.find_elements(By.CSS_SELECTOR, ".entry-meta .entry-categories a, .cat-links a")
+        categories = ", ".join([cat.text.strip() for cat in category_elements])
+    except:
+        categories = "No category available"
+    
+    # get content
+    try:
+        content = ""
+        for selector in CONTENT_SELECTORS:
+            try:
+                content_element = driver.find_element(By.CSS_SELECTOR, selector)
+                content = content_element.text.strip()
+                if content:
+                    break
+            except:
+                continue
+        
+        if not content:
+            content = "Getting Article Error"
+    except Exception as e:
+        print(f"Error: {e}")
+        content = "Error"
+    
+    return title, date, categories, content
+
+
 ##### Approch 02: Requests + BeautifulSoup
 
-def scrape_with_beautifulsoup():
+def scrape_with_beautifulsoup(base_url=BASE_URL):
 
     articles = []
     failure_count = 0
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
-    
-    for page in range(1, PAGES_TO_SCRAPE + 1):
-        # URL
-        if page == 1:
-            url = BASE_URL
-        else:
-            url = f"{BASE_URL}page/{page}/"
-        
-        print(f"BeautifulSoup: Page {page}  - {url}")
+    with Fetcher() as fetcher:
+        # listing pages, all in flight together
+        page_urls = []
+        for page in range(1, PAGES_TO_SCRAPE + 1):
+            # URL
+            if page == 1:
+                page_urls.append(base_url)
+            else:
+                page_urls.append(f"{base_url}page/{page}/")
         
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()  # catch error?
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            article_elements = soup.select('article.post')
-            if not article_elements:
-                article_elements = soup.select('article')
-            
-            print(f"Getting {len(article_elements)} articles.")
+        article_links = []
+        for page, (url, response, error) in enumerate(fetcher.map(page_urls), start=1):
+            print(f"BeautifulSoup: Page {page}  - {url}")
             
-            article_links = []
-            for article in article_elements:
-                try:
-                    # title + link
-                    title_element = article.select_one('h2 a, h1 a, .entry-title a')
-                    if not title_element:
-                        continue
-                        
-                    title = title_element.text.strip()
-                    link = title_element['href']
-                    
+            try:
+                if error:
+                    raise error
+                
+                page_links, failures = extract_links(response.text, page, PARSER, RESTRICTED_PARSE)
+                failure_count += failures
+                
+                for article_info in page_links:
                     # store link
-                    article_links.append({"title": title, "url": link, "page": page})
-                    print(f"The article: {title}")
-                except Exception as e:
-                    failure_count += 1
-                    print(f"❌ Article Scraping Fail : {e}")
-                    continue
-            
-            # connect to the articles
-            for article_info in article_links:
-                try:
-                    print(f"Reading: {article_info['title']}")
-                    
-                    article_response = requests.get(article_info['url'], headers=headers, timeout=10)
-                    article_response.raise_for_status()
-                    
-                    article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                    
-                    # title
-                    title_element = article_soup.select_one('h1.entry-title')
-                    title = title_element.text.strip() if title_element else article_info['title']
+                    article_links.append(article_info)
+                    print(f"The article: {article_info['title']}")
                     
-                    # date
-                    date_element = article_soup.select_one('.entry-meta .entry-date, .post-date')
-                    date = date_element.text.strip() if date_element else "No date available"
-                    
-                    # dategory
-                    category_elements = article_soup.select('.entry-meta .entry-categories a, .cat-links a')
-                    categories = ", ".join([cat.text.strip() for cat in category_elements]) if category_elements else "No category available"
-                    
-                    # content
-                    content = ""
-                    # different container
-                    content_selectors = [
-                        '.entry-content',
-                        '.post-content',
-                        'article .content',
-                        '.post .entry'
-                    ]
-                    
-                    for selector in content_selectors:
-                        content_element = article_soup.select_one(selector)
-                        if content_element:
-                            # combine paragraphs
-                            paragraphs = content_element.select('p')
-                            if paragraphs:
-                                content = "\n".join([p.text.strip() for p in paragraphs])
-                                break
-                            else:
-                                content = content_element.text.strip()
-                                break
-                    
-                    if not content:
-                        content = "Getting Article Error"
-                    
-                    # list
-                    articles.append({
-                        "title": title,
-                        "url": article_info['url'],
-                        "date": date,
-                        "categories": categories,
-                        "content": content,
-                        "source_page": article_info['page'],
-                        "method": "BeautifulSoup"
-                    })
-                    
-                    print(f"✅ : {title}")
-                except Exception as e:
-                    failure_count += 1
-                    print(f"❌ : {e}")
-                    continue
+            except Exception as e:
+                failure_count += 1
+                print(f"❌ Fail in Page {page} : {e}")
+                continue
+        
+        # connect to the articles, N requests in flight
+        article_urls = [article_info['url'] for article_info in article_links]
+        for article_info, (_, article_response, error) in zip(article_links, fetcher.map(article_urls)):
+            try:
+                print(f"Reading: {article_info['title']}")
+                if error:
+                    raise error
                 
-                # pending
-                time.sleep(2)
+                # list
+                article = extract_article(article_response.text, article_info, PARSER, RESTRICTED_PARSE)
+                articles.append(article)
                 
-        except Exception as e:
-            failure_count += 1
-            print(f"❌ Fail in Page {page} : {e}")
-            continue
-        
-        time.sleep(3)
+                print(f"✅ : {article['title']}")
+            except Exception as e:
+                failure_count += 1
+                print(f"❌ : {e}")
+                continue
+
     denominator = len(articles) + failure_count
     success_rate = 100 * len(articles) / denominator if denominator > 0 else 0
     return articles,success_rate
@@ -309,31 +322,57 @@ if __name__ == "__main__":
     print("Comparison Result Report")
     print("-" * 50)
     
-    # Selenium
-    print("\nSelenium Scraping......")
-    selenium_articles, selenium_time, selenium_res_before, selenium_res_after, selenium_success_rate = benchmark_function(scrape_with_selenium)
-    selenium_df = pd.DataFrame(selenium_articles)
-    selenium_df.to_csv(f"{folder_path}/Article(se).csv", index=False, encoding='utf-8')
+    base_url = BASE_URL
+    replay_server = None
+    if REPLAY_ARCHIVE:
+        replay_server = ReplayServer(REPLAY_ARCHIVE, REPLAY_PROFILE).start()
+        base_url = replay_server.rewrite(BASE_URL)
+        print(f"Replaying {REPLAY_ARCHIVE} on {replay_server.url} (profile: {REPLAY_PROFILE})")
     
-    # BeautifulSoup
-    print("\nBeautifulSoup Scraping......")
-    bs_articles, bs_time, bs_res_before, bs_res_after, bs_success_rate = benchmark_function(scrape_with_beautifulsoup)
+    try:
+        # Selenium
+        print("\nSelenium Scraping......")
+        selenium_articles, selenium_time, selenium_stats, selenium_trials, selenium_success_rate = benchmark_function(scrape_with_selenium, base_url)
+        selenium_df = pd.DataFrame(selenium_articles)
+        selenium_df.to_csv(f"{folder_path}/Article(se).csv", index=False, encoding='utf-8')
+        
+        # BeautifulSoup
+        print("\nBeautifulSoup Scraping......")
+        bs_articles, bs_time, bs_stats, bs_trials, bs_success_rate = benchmark_function(scrape_with_beautifulsoup, base_url)
+    finally:
+        if replay_server:
+            replay_server.stop()
     bs_df = pd.DataFrame(bs_articles)
     bs_df.to_csv(f"{folder_path}/Article(bs).csv", index=False, encoding='utf-8')
     
     # Create a DataFrame for the report instead of writing to a text file
     reportArray = {
-        " ": ["Articles", "Timing(s)", "Performance(s/article)", 
-              "Success Rate(%)", "CPU Usage(%)", "RAM Usage(%)"],
-        "Selenium": [len(selenium_articles), f"{selenium_time:.2f}", f"{selenium_time/len(selenium_articles):.2f}",
-                     f"{selenium_success_rate:.2f}", f"{selenium_res_after['cpu_usage']:.2f}",f"{selenium_res_after['memory_usage']:.2f}"],
-        "BeautifulSoup": [len(bs_articles), f"{bs_time:.2f}", f"{bs_time/len(bs_articles):.2f}",
-                          f"{bs_success_rate:.2f}", f"{bs_res_after['cpu_usage']:.2f}",f"{bs_res_after['memory_usage']:.2f}"]
+        " ": ["Articles", "Timing(s)", "Timing p95(s)", "Performance(s/article)", 
+              "Success Rate(%)", "CPU Usage(%)", "CPU Time(s)", "Peak RAM(MB)", "Mean RAM(MB)", "Peak Threads"],
+        "Selenium": [len(selenium_articles), f"{selenium_time:.2f}", f"{selenium_stats['wall_time_s']['p95']:.2f}", f"{selenium_time/len(selenium_articles):.2f}",
+                     f"{selenium_success_rate:.2f}", f"{selenium_stats['cpu_percent']['median']:.2f}", f"{selenium_stats['cpu_time_s']['median']:.2f}",
+                     f"{selenium_stats['peak_rss_mb']['median']:.2f}", f"{selenium_stats['mean_rss_mb']['median']:.2f}", f"{selenium_stats['peak_threads']['median']:.0f}"],
+        "BeautifulSoup": [len(bs_articles), f"{bs_time:.2f}", f"{bs_stats['wall_time_s']['p95']:.2f}", f"{bs_time/len(bs_articles):.2f}",
+                          f"{bs_success_rate:.2f}", f"{bs_stats['cpu_percent']['median']:.2f}", f"{bs_stats['cpu_time_s']['median']:.2f}",
+                          f"{bs_stats['peak_rss_mb']['median']:.2f}", f"{bs_stats['mean_rss_mb']['median']:.2f}", f"{bs_stats['peak_threads']['median']:.0f}"]
     }
     
     df_reportArray = pd.DataFrame(reportArray)
     df_reportArray.to_csv("Part01_Benchmark Report.csv", index=False)
     
+    # machine readable version, every trial included
+    with open("Part01_Benchmark Report.json", "w") as f:
+        json.dump({
+            "trials": TRIALS,
+            "replay_archive": REPLAY_ARCHIVE,
+            "replay_profile": REPLAY_PROFILE if REPLAY_ARCHIVE else None,
+            "sample_interval_s": SAMPLE_INTERVAL,
+            "Selenium": {"articles": len(selenium_articles), "success_rate": selenium_success_rate,
+                         "summary": selenium_stats, "trials": selenium_trials},
+            "BeautifulSoup": {"articles": len(bs_articles), "success_rate": bs_success_rate,
+                              "summary": bs_stats, "trials": bs_trials},
+        }, f, indent=2)
+    
     # Print the report to console
     print("\n" + "=" * 50)
     print("Comparison Result Report:")
@@ -1,149 +1,142 @@
-import time
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import os
+
+from corpus_store import CORPUS_PATH, CorpusWriter, import_csv, store_is_current
+from dedup import DuplicateIndex
+from extract import extract_links, resolve_parser
+from fetcher import Fetcher
+from frontier import Frontier
+from http_cache import HttpCache
+from pipeline import ParsePipeline
+from sink import ArticleSink, Tee
 
 
 
 
 BASE_URL = "https://www.coffeereview.com/category/articles/"
 PAGES_TO_SCRAPE = 6  # scraping pages 
+INCREMENTAL = True  # stop paging at already known articles
+ARTICLES_CSV = "Articles_Coffee.csv"  # .csv or .jsonl
+PARSER = resolve_parser("lxml")  # html.parser, lxml or html5lib
+RESTRICTED_PARSE = True  # only build the article regions
+PARSE_WORKERS = os.cpu_count() or 1  # parser processes, 0 = parse in this process
+PROCESS_POOL_MIN_ARTICLES = 50
+DEDUP_SKIP = True  # drop near-duplicate articles; False only reports them
 
 
 
-def scrape_with_beautifulsoup():
+def scrape_with_beautifulsoup(frontier, sink, dedup=None, cache=None, base_url=BASE_URL):
 
-    articles = []
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
+    article_count = 0
+    duplicate_count = 0
+    failure_count = 0
     
-    for page in range(1, PAGES_TO_SCRAPE + 1):
-        # URL
-        if page == 1:
-            url = BASE_URL
-        else:
-            url = f"{BASE_URL}page/{page}/"
-        
-        print(f"BeautifulSoup: Page {page}  - {url}")
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()  # catch error?
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            article_elements = soup.select('article.post')
-            if not article_elements:
-                article_elements = soup.select('article')
+    with Fetcher(cache=cache) as fetcher:
+        # listing pages, newest first; stop once a page brings nothing new
+        for page in range(1, PAGES_TO_SCRAPE + 1):
+            # URL
+            if page == 1:
+                url = base_url
+            else:
+                url = f"{base_url}page/{page}/"
             
-            print(f"Getting {len(article_elements)} articles.")
+            print(f"BeautifulSoup: Page {page}  - {url}")
             
-            article_links = []
-            for article in article_elements:
-                try:
-                    # title + link
-                    title_element = article.select_one('h2 a, h1 a, .entry-title a')
-                    if not title_element:
-                        continue
-                        
-                    title = title_element.text.strip()
-                    link = title_element['href']
-                    
+            try:
+                response = fetcher.get(url, revalidate=INCREMENTAL)
+                
+                article_links, failures = extract_links(response.text, page, PARSER, RESTRICTED_PARSE)
+                failure_count += failures
+                
+                new_links = 0
+                for article_info in article_links:
                     # store link
-                    article_links.append({"title": title, "url": link, "page": page})
-                    print(f"The article: {title}")
-                except Exception as e:
-                    failure_count += 1
-                    print(f"❌ Article Scraping Fail : {e}")
-                    continue
-            
-            # connect to the articles
-            for article_info in article_links:
-                try:
-                    print(f"Reading: {article_info['title']}")
-                    
-                    article_response = requests.get(article_info['url'], headers=headers, timeout=10)
-                    article_response.raise_for_status()
+                    if frontier.add(article_info['url'], article_info['title'], page):
+                        new_links += 1
+                        print(f"The article: {article_info['title']}")
                     
-                    article_soup = BeautifulSoup(article_response.text, 'html.parser')
-                    
-                    # title
-                    title_element = article_soup.select_one('h1.entry-title')
-                    title = title_element.text.strip() if title_element else article_info['title']
-                    
-                    # date
-                    date_element = article_soup.select_one('.entry-meta .entry-date, .post-date')
-                    date = date_element.text.strip() if date_element else "No date available"
-                    
-                    # dategory
-                    category_elements = article_soup.select('.entry-meta .entry-categories a, .cat-links a')
-                    categories = ", ".join([cat.text.strip() for cat in category_elements]) if category_elements else "No category available"
-                    
-                    # content
-                    content = ""
-                    # different container
-                    content_selectors = [
-                        '.entry-content',
-                        '.post-content',
-                        'article .content',
-                        '.post .entry'
-                    ]
-                    
-                    for selector in content_selectors:
-                        content_element = article_soup.select_one(selector)
-                        if content_element:
-                            # combine paragraphs
-                            paragraphs = content_element.select('p')
-                            if paragraphs:
-                                content = "\n".join([p.text.strip() for p in paragraphs])
-                                break
-                            else:
-                                content = content_element.text.strip()
-                                break
-                    
-                    if not content:
-                        content = "Getting Article Error"
-                    
-                    # list
-                    articles.append({
-                        "title": title,
-                        "url": article_info['url'],
-                        "date": date,
-                        "categories": categories,
-                        "content": content,
-                        "source_page": article_info['page'],
-                        "method": "BeautifulSoup"
-                    })
-                    
-                    print(f"✅ : {title}")
-                except Exception as e:
-                    print(f"❌ : {e}")
-                    continue
+            except Exception as e:
+                failure_count += 1
+                print(f"❌ Fail in Page {page} : {e}")
+                continue
+            
+            if INCREMENTAL and new_links == 0:
+                print(f"No new articles on page {page}, stop paging.")
+                break
+        
+        # connect to the articles: download threads -> bounded queue -> parser processes
+        # includes articles left over from an interrupted run
+        article_links = frontier.pending()
+        print(f"{len(article_links)} articles to read.")
+        # small refreshes are not worth the process start-up
+        workers = PARSE_WORKERS if len(article_links) >= PROCESS_POOL_MIN_ARTICLES else 0
+        pipeline = ParsePipeline(fetcher, PARSER, RESTRICTED_PARSE, workers=workers)
+        for article_info, content_hash, article, error in pipeline.run(article_links):
+            try:
+                print(f"Reading: {article_info['title']}")
+                if error:
+                    raise error
+                frontier.mark_fetched(article_info['url'], content_hash)
+                
+                # near-duplicate of something we already stored?
+                match = dedup.check(article['url'], article['content']) if dedup else None
+                if match:
+                    duplicate_count += 1
+                    print(f"♻️ Duplicate ({match[1]:.2f}) of {match[0]} : {article['title']}")
+                    if DEDUP_SKIP:
+                        frontier.mark_duplicate(article['url'], match[0])
+                        continue
                 
-                # pending
-                time.sleep(2)
+                # stream it out, nothing is kept in memory
+                sink.write(article)
+                frontier.mark_parsed([article['url']])
+                article_count += 1
                 
-        except Exception as e:
-            print(f"❌ Fail in Page {page} : {e}")
-            continue
+                print(f"✅ : {article['title']}")
+            except Exception as e:
+                failure_count += 1
+                frontier.mark_failed(article_info['url'], e)
+                print(f"❌ : {e}")
+                continue
         
-        time.sleep(3)
+        print(pipeline.report())
+        print(f"Near-duplicates: {duplicate_count}")
+        fetch_stats = fetcher.summary()
+        print(f"Requests: {fetch_stats['requests']}, retries {fetch_stats['retries']}, "
+              f"throttled {fetch_stats['throttled']}, final rate (req/s) {fetch_stats['rates']}")
 
-    return articles
+    return article_count
 
 
 # Processing
-print("\nBeautifulSoup Scraping......")
-bs_articles= scrape_with_beautifulsoup()
-bs_df = pd.DataFrame(bs_articles)
-bs_df.to_csv("Articles_Coffee.csv", index=False, encoding='utf-8')
+# guarded: the parser processes re-import this module
+if __name__ == "__main__":
+    print("\nBeautifulSoup Scraping......")
+    cache = HttpCache()
+    frontier = Frontier()
+    dedup = DuplicateIndex()
+    # columnar copy for the Part02 stages: new articles go to it next to the file when it
+    # matches the file (nothing left to recover), otherwise it is rebuilt once afterwards
+    in_step = store_is_current(ARTICLES_CSV, CORPUS_PATH) and not os.path.exists(ARTICLES_CSV + ".part")
+    corpus = CorpusWriter(CORPUS_PATH, append=True) if in_step else None
+    # only the new articles are appended; the file is swapped in atomically at the end
+    with ArticleSink(ARTICLES_CSV, append=True) as sink:
+        new_articles = scrape_with_beautifulsoup(frontier, Tee(sink, corpus) if corpus else sink, dedup, cache)
+    print(f"\n{new_articles} new articles, frontier: {frontier.counts()}")
     
+    # closed after the sink, so the store stays newer than the file
+    if corpus:
+        corpus.close()
+        rows = corpus.rows
+    else:
+        rows = import_csv(ARTICLES_CSV, CORPUS_PATH)
+    print(f"Corpus store: {rows} articles in {CORPUS_PATH}")
+    frontier.close()
+    dedup.close()
 
+    # cache report
+    cache.evict()
+    cache_stats = cache.summary()
+    print(f"\nHTTP cache: {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated (304), "
+          f"{cache_stats['misses']} misses, {cache_stats['evicted']} evicted, hit rate {cache_stats['hit_rate']:.1f}%")
     
-print("\nFinishing Processing")
+    print("\nFinishing Processing")
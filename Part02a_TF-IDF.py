@@ -1,106 +1,84 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from nltk.stem.porter import PorterStemmer
-from nltk.stem import WordNetLemmatizer
-import re
 import os
+from contextlib import nullcontext
 
+from corpus_store import iter_corpus, load_processed
+from ann import RELATED_INDEX, RelatedIndex, related_table
+from keywords import keyword_table
+from preprocess_cache import PreprocessCache
+from textnorm import TFIDF_STOPWORDS, normalize_many, normalizer_pool
+from tfidf_model import MODEL_DIR, MatrixWriter, fit_models, fit_streaming, save_models
 
+
+ARTICLES_PATH = "Articles_Coffee.csv"  # .csv or .jsonl; the columnar store is used when current
 output_dir = "Part02_TF-IDF_Result"
+PREPROCESS_WORKERS = os.cpu_count() or 1  # 1 = serial
+STREAMING = False        # True: never hold the whole corpus in memory (see keywords_streaming)
+STREAM_CHUNKSIZE = 1000  # articles per chunk in streaming mode
 os.makedirs(output_dir, exist_ok=True)
 
-# pre process
-def preprocess(df, content_col='content'):
-    
-    lemmatizer = WordNetLemmatizer()
-    
-    def process_text(text):
-        if not isinstance(text, str):
-            return ""
-        
+# vectorizer settings of the two reports; fit together, saved under MODEL_DIR
+TFIDF_CONFIGS = {
+    'per': dict(max_features=500, min_df=2, max_df=0.7, ngram_range=(1, 2)),
+    'all': dict(max_features=600,
+                min_df=1,          # at list exist in 10 articles
+                max_df=0.9,        # at most exist in 90% articles
+                ngram_range=(1, 2)),
+}
 
-        text = text.lower()
-        text = re.sub(r'[0-9]+', '', text)
-        text = re.sub(r'[^\w\s]', '', text)
-        words = text.split()
-        common_words = ['the', 'and', 'to', 'of', 'a', 'in', 'that', 'is', 'it', 'for', 'with', 'on', 'by', 
-                        'this', 'as', 'be', 'at', 'are', 'was', 'from', 'has', 'have', 'had', 'been', 'but', 
-                        'not', 'what', 'all', 'were', 'when', 'we', 'they', 'their', 'you', 'your', 'his', 
-                        'her', 'says', 'said', 'say', 'one', 'two', 'three', 'many', 'much', 'can', 'will', 
-                        'just', 'would', 'could', 'should', 'now', 'then', 'than', 'our','here', 'there','why',
-                        'these', 'those','year','per','about','who','report','variety','notes','like','she','he',
-                        'other','month','daddy']
-
-        filtered_words = [lemmatizer.lemmatize(word) for word in words 
-                          if len(word) > 2 and word not in common_words]
-        
-        return ' '.join(filtered_words)
+# pre process
+def preprocess(df, content_col='content', workers=PREPROCESS_WORKERS, cache=None, pool=None):
     
     # new dataframe
     df_processed = df.copy()
     
-    # text process
-    df_processed['filtered_content'] = df[content_col].apply(process_text)
+    # text process, split over `workers` processes (or the given normalizer_pool) for large corpora
+    df_processed['filtered_content'] = normalize_many(df[content_col], TFIDF_STOPWORDS, workers, raw=False,
+                                                      cache=cache, pool=pool)
     
     return df_processed
 
 
 # 1. each articles
-def keywords_perArticle(df, n_keywords=5):
+def keywords_perArticle(df, n_keywords=5, model=None):
 
     # prepocess
     if 'filtered_content' not in df.columns:
         df = preprocess(df)
     
-    tfidf_vectorizer = TfidfVectorizer(
-        max_features=500,
-        min_df=2,
-        max_df=0.7,
-        ngram_range=(1, 2)
-    )
-    
-    tfidf_matrix = tfidf_vectorizer.fit_transform(df['filtered_content'])
+    if model is None:
+        model = fit_models(df['filtered_content'], {'per': TFIDF_CONFIGS['per']})['per']
 
-    feature_names = tfidf_vectorizer.get_feature_names_out()
+    tfidf_matrix = model.matrix
+    feature_names = model.get_feature_names_out()
 
-    article_keywords = pd.DataFrame(columns=['article_id', 'title', 'top_keywords', 'tfidf_scores'])
-    
-    for i, row in df.iterrows():
-        article_vector = tfidf_matrix[i]
-        article_tfidf = pd.Series(article_vector.toarray().flatten(), index=feature_names)
-        
-        top_article_terms = article_tfidf.sort_values(ascending=False).head(n_keywords)
-        
-        article_keywords = pd.concat([article_keywords, pd.DataFrame({
-            'article_id': [i+1],
-            'title': [row['title']],
-            'top_keywords': [',\n'.join(top_article_terms.index)],
-            'tfidf_scores': [',\n'.join([f"{score:.3f}" for score in top_article_terms.values])]
-        })], ignore_index=True)
+    # top-k straight from the sparse rows, table built once
+    article_keywords = keyword_table(tfidf_matrix, feature_names, df['title'], n_keywords)
     
     return article_keywords
 
 
 # 2. all articles
-def keywords_allArticle(df, top_n=20, normalize=True):
+def keywords_allArticle(df, top_n=20, normalize=True, model=None):
     
     if 'filtered_content' not in df.columns:
         df = preprocess(df)
     
-    tfidf_vectorizer = TfidfVectorizer(
-        max_features=600,
-        min_df=1,          # at list exist in 10 articles
-        max_df=0.9,        # at most exist in 90% articles
-        ngram_range=(1, 2) 
-    )
-    
-    tfidf_matrix = tfidf_vectorizer.fit_transform(df['filtered_content'])
+    if model is None:
+        model = fit_models(df['filtered_content'], {'all': TFIDF_CONFIGS['all']})['all']
 
-    feature_names = tfidf_vectorizer.get_feature_names_out()
+    tfidf_matrix = model.matrix
+    feature_names = model.get_feature_names_out()
 
     global_scores = np.array(tfidf_matrix.sum(axis=0)).flatten()
 
+    return rank_keywords(feature_names, global_scores, top_n, normalize)
+
+
+# top words and top phrases (half each) by summed tf-idf
+def rank_keywords(feature_names, global_scores, top_n=20, normalize=True):
+
     if normalize:
         min_score = global_scores.min()
         max_score = global_scores.max()
@@ -124,20 +102,88 @@ def keywords_allArticle(df, top_n=20, normalize=True):
     
     return top_keywords
 
+# 3. both reports out-of-core: two passes over the corpus, chunk by chunk
+# pass 1 counts document frequencies, pass 2 scores each chunk with the final
+# vocabulary/IDF and appends its rows to the saved models under model_dir;
+# memory depends on the chunk size and vocabulary, not the corpus
+def keywords_streaming(articles_path, per_path, n_keywords=5, top_n=20, normalize=True,
+                       chunksize=STREAM_CHUNKSIZE, cache=None, model_dir=MODEL_DIR, workers=PREPROCESS_WORKERS):
+
+    # one pool of warmed-up normalizers for every chunk of both passes
+    with normalizer_pool(TFIDF_STOPWORDS, workers) if workers > 1 else nullcontext() as pool:
+
+        def chunks(columns):
+            for chunk in iter_corpus(articles_path, columns, chunksize):
+                yield chunk, normalize_many(chunk['content'], TFIDF_STOPWORDS, raw=False, cache=cache, pool=pool)
+
+        models = fit_streaming(lambda: (texts for _, texts in chunks(['content'])), TFIDF_CONFIGS)
+
+        writers = {name: MatrixWriter(model, os.path.join(model_dir, name)) for name, model in models.items()}
+        global_scores = np.zeros(len(models['all'].feature_names))
+        first_id = 1
+        header = True
+        for chunk, texts in chunks(['title', 'content']):
+            all_matrix = models['all'].transform(texts)
+            writers['all'].write(all_matrix)
+            global_scores += np.asarray(all_matrix.sum(axis=0)).ravel()
+
+            per_matrix = models['per'].transform(texts)
+            writers['per'].write(per_matrix)
+            per_keywords = keyword_table(per_matrix, models['per'].feature_names, chunk['title'], n_keywords, first_id)
+            per_keywords.to_csv(per_path, index=False, mode='w' if header else 'a', header=header)
+            first_id += per_matrix.shape[0]
+            header = False
+
+    for writer in writers.values():
+        writer.close()
+    return models, rank_keywords(models['all'].feature_names, global_scores, top_n, normalize)
+
 # Main execution
-if __name__ == "__main__":
-    df = pd.read_csv("Articles_Coffee.csv")
-    print(f"Loaded {len(df)} articles.")
-    
-    df_processed = preprocess(df)
-    
+if __name__ == "__main__" and STREAMING:
+    preprocess_cache = PreprocessCache()
+    models, all_keywords = keywords_streaming(ARTICLES_PATH, f"{output_dir}/1. TF-IDF_keywords(per).csv",
+                                              5, 50, cache=preprocess_cache)
+    print(f"Streamed {models['all'].matrix.shape[0]} articles in chunks of {STREAM_CHUNKSIZE}.")
+    preprocess_cache.report()
+    preprocess_cache.close()
+    all_keywords.to_csv(f"{output_dir}/1. TF-IDF_keywords(all).csv", index=False)
+
+    # 3. related articles from the stored (memory-mapped) per-article rows, a chunk at a time
+    per_matrix = models['per'].matrix
+    related_index = RelatedIndex(per_matrix.shape[1])
+    for start in range(0, per_matrix.shape[0], STREAM_CHUNKSIZE):
+        related_index.add(per_matrix[start:start + STREAM_CHUNKSIZE])
+    related_index.save(RELATED_INDEX)
+    titles = [title for chunk in iter_corpus(ARTICLES_PATH, ['title'], STREAM_CHUNKSIZE) for title in chunk['title']]
+    related_table(related_index, titles).to_csv(f"{output_dir}/2. Related_articles.csv", index=False)
+
+elif __name__ == "__main__":
+    # read and normalized a chunk at a time; only titles and normalized text are kept
+    preprocess_cache = PreprocessCache()
+    with normalizer_pool(TFIDF_STOPWORDS) if PREPROCESS_WORKERS > 1 else nullcontext() as pool:
+        df_processed = load_processed(ARTICLES_PATH, ['title', 'content'], lambda chunk: preprocess(
+            chunk, cache=preprocess_cache, pool=pool).drop(columns='content'))
+    print(f"Loaded {len(df_processed)} articles.")
+    preprocess_cache.report()
+    preprocess_cache.close()
+    
+    # one shared fit for both reports, kept for transform-only scoring (tfidf_model.py)
+    models = fit_models(df_processed['filtered_content'], TFIDF_CONFIGS)
+    save_models(models, MODEL_DIR)
+
     # 1. top 5 keywords for each article
-    per_keywords = keywords_perArticle(df_processed, 5)    
+    per_keywords = keywords_perArticle(df_processed, 5, model=models['per'])    
     per_keywords.to_csv(f"{output_dir}/1. TF-IDF_keywords(per).csv", index=False)
 
     # 2. top 30 keywords for all articles
-    all_keywords = keywords_allArticle(df_processed, 50)    
+    all_keywords = keywords_allArticle(df_processed, 50, model=models['all'])    
     all_keywords.to_csv(f"{output_dir}/1. TF-IDF_keywords(all).csv", index=False)
 
+    # 3. related articles (LSH over the per-article vectors); new articles: ann.py add
+    related_index = RelatedIndex(models['per'].matrix.shape[1])
+    related_index.add(models['per'].matrix)
+    related_index.save(RELATED_INDEX)
+    related_table(related_index, df_processed['title']).to_csv(f"{output_dir}/2. Related_articles.csv", index=False)
+
     
 print("\nFinishing Processing")
\ No newline at end of file
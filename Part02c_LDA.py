@@ -1,113 +1,73 @@
 import pandas as pd
 import numpy as np
-import re
 from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.decomposition import LatentDirichletAllocation
 import os
-from nltk.stem import WordNetLemmatizer
+from contextlib import nullcontext
 
+from corpus_store import load_processed
+from lda_models import CORES, LDA_STATE, TopicState, document_keys, fit_concurrently
+from lda_select import SELECTION_WORKERS, best_config, select_topics
+from preprocess_cache import PreprocessCache
+from textnorm import LDA_STOPWORDS, normalize_many, normalizer_pool
+from tfidf_model import count_vectorize
+from topic_eval import TOP_N, evaluate_topics
 
+
+ARTICLES_PATH = "Articles_Coffee.csv"  # .csv or .jsonl; the columnar store is used when current
 output_dir = "Part02_LDA_Result"
+PREPROCESS_WORKERS = os.cpu_count() or 1  # 1 = serial
+MODEL_SELECTION = False          # True: pick K and the prior by held-out perplexity first
+TOPIC_GRID = range(3, 11)
+PRIOR_GRID = [0.1, 0.5, 1.0]     # doc_topic_prior values
+LDA_CORES = CORES                # shared by the word and phrase models
+INCREMENTAL = False              # True: only new articles, online update of the saved models
+COHERENCE_TOP_N = TOP_N          # terms per topic scored by UMass / NPMI coherence
 os.makedirs(output_dir, exist_ok=True)
 
-def preprocess_for_lda(df, content_col='content'):
-
-    lemmatizer = WordNetLemmatizer()
-    common_words = ['the', 'and', 'to', 'of', 'a', 'in', 'that', 'is', 'it', 'for', 'with', 'on', 'by', 
-                        'this', 'as', 'be', 'at', 'are', 'was', 'from', 'has', 'have', 'had', 'been', 'but', 
-                        'not', 'what', 'all', 'were', 'when', 'we', 'they', 'their', 'you', 'your', 'his', 
-                        'her', 'says', 'said', 'say', 'one', 'two', 'three', 'many', 'much', 'can', 'will', 
-                        'just', 'would', 'could', 'should', 'now', 'then', 'than', 'our','here', 'there','why',
-                        'these', 'those','year','per','about','who','report','variety','notes','like','she','he',
-                        'variety']
-    
-    def textprocess(text):
-        text = text.lower()
-        text = re.sub(r'[0-9]+', '', text)
-        text = re.sub(r'[^\w\s]', '', text)
-        words = text.split()
+def preprocess_for_lda(df, content_col='content', workers=PREPROCESS_WORKERS, cache=None, pool=None):
 
-        return words
-    
-    def clean_text(text):
-        if not isinstance(text, str):
-            return ""
-        
-        thewords = textprocess(text)
-        filtered_words = [lemmatizer.lemmatize(word) for word in thewords
-                         if len(word) > 2 and word not in common_words]
-        
-        return ' '.join(filtered_words)
-    
-    def prep_for_phrases(text):
-        if not isinstance(text, str):
-            return ""
-        
-        thewords = textprocess(text)
-        filtered_words = [word for word in thewords
-                         if len(word) > 2 and word not in common_words]
-        
-        return ' '.join(filtered_words)
+    # one tokenization pass gives both the lemmatized and the raw words,
+    # split over `workers` processes (or the given normalizer_pool) for large corpora
+    normalized = normalize_many(df[content_col], LDA_STOPWORDS, workers, cache=cache, pool=pool)
     
     df_processed = df.copy()
 
-    df_processed['clean_text'] = df[content_col].apply(clean_text)
-    df_processed['phrase_text'] = df[content_col].apply(prep_for_phrases)
+    df_processed['clean_text'] = [clean for clean, _ in normalized]
+    df_processed['phrase_text'] = [phrase for _, phrase in normalized]
     
     return df_processed
 
-def perform_lda_analysis(df, n_topics):
-
-    word_vectorizer = CountVectorizer(
+# vectorizer settings of the two models
+COUNT_CONFIGS = {
+    'word': dict(
         max_df=0.9,          # %
         min_df=3,            #amount
         max_features=600,    # features
         ngram_range=(1, 1)  # only single word
-    )
-    
-    phrase_vectorizer = CountVectorizer(
+    ),
+    'phrase': dict(
         max_df=0.9,
         min_df=1,
         max_features=300,  
         ngram_range=(2, 2) # phrases
-    )
-    
+    ),
+}
 
-    word_matrix = word_vectorizer.fit_transform(df['clean_text'])
-    phrase_matrix = phrase_vectorizer.fit_transform(df['clean_text'])
+# counts: count_vectorize(df['clean_text'], COUNT_CONFIGS), shared with model selection
+def perform_lda_analysis(counts, n_topics, doc_topic_prior=0.5, cores=LDA_CORES):
 
-    word_features = word_vectorizer.get_feature_names_out()
-    phrase_features = phrase_vectorizer.get_feature_names_out()
-    
+    word_features, word_matrix, _ = counts['word']
+    phrase_features, phrase_matrix, _ = counts['phrase']
 
-    word_lda = LatentDirichletAllocation(
-        n_components=n_topics,
-        max_iter=10,    # set
-        learning_method='online',
-        random_state=0,
-        n_jobs=-1,
-        doc_topic_prior=0.5,
-    )
-    
-    phrase_lda = LatentDirichletAllocation(
-        n_components=n_topics,
-        max_iter=10,    # set
-        learning_method='online',
-        random_state=0,
-        n_jobs=-1,
-        doc_topic_prior=0.5,
-    )
-    
+    # fixed-vocabulary vectorizers, for scoring new documents
+    word_vectorizer = CountVectorizer(vocabulary=word_features, ngram_range=COUNT_CONFIGS['word']['ngram_range'])
+    phrase_vectorizer = CountVectorizer(vocabulary=phrase_features, ngram_range=COUNT_CONFIGS['phrase']['ngram_range'])
 
-    word_lda.fit(word_matrix)
-    phrase_lda.fit(phrase_matrix)
-    
-    word_document_topics = word_lda.transform(word_matrix)
-    phrase_document_topics = phrase_lda.transform(phrase_matrix)
+    # both models at once, cores split between them; document topics come with the fit
+    (word_lda, word_document_topics), (phrase_lda, phrase_document_topics) = fit_concurrently(
+        [word_matrix, phrase_matrix], n_topics, doc_topic_prior, cores)
 
-    combined_document_topics = (word_document_topics + phrase_document_topics) / 2
-    
-    return (word_lda, phrase_lda), (word_vectorizer, phrase_vectorizer), (word_features, phrase_features), combined_document_topics
+    return (word_lda, phrase_lda), (word_vectorizer, phrase_vectorizer), (word_features, phrase_features), (word_document_topics, phrase_document_topics)
 
 def display_topics(lda_models, feature_names_sets, n_words, n_phrases):
 
@@ -172,7 +132,7 @@ def display_topics(lda_models, feature_names_sets, n_words, n_phrases):
     
     return topics_data
 
-def analyze_document_topics(document_topics, df):
+def analyze_document_topics(document_topics, df, name='article_topic_distribution.csv', summary_name='topic_distribution.txt'):
 
     dominant_topics = document_topics.argmax(axis=1)
     
@@ -197,7 +157,7 @@ def analyze_document_topics(document_topics, df):
 
     df_results = pd.DataFrame(results)
 
-    df_results.to_csv(f"{output_dir}/article_topic_distribution.csv", index=False)
+    df_results.to_csv(f"{output_dir}/{name}", index=False)
 
     topic_counts = df_results['dominant_topic'].value_counts().sort_index()
     
@@ -209,7 +169,7 @@ def analyze_document_topics(document_topics, df):
         distribution_text += line
 
     print("\n" + distribution_text)
-    with open(f"{output_dir}/topic_distribution.txt", "w") as f:
+    with open(f"{output_dir}/{summary_name}", "w") as f:
         f.write(distribution_text)
 
     return df_results
@@ -217,27 +177,72 @@ def analyze_document_topics(document_topics, df):
 # execusion
 if __name__ == "__main__":
 
-    df = pd.read_csv("Articles_Coffee.csv")
-
-    content_col = 'content'  # define the column be processed
-    if content_col not in df.columns:
-        possible_cols = [col for col in df.columns if 'content' in col.lower() or 'text' in col.lower()]
-        if possible_cols:
-            content_col = possible_cols[0]
-        else:
-            print("Error")
-            exit(1)
-
-    df_processed = preprocess_for_lda(df, content_col)
+    # read and normalized a chunk at a time; only titles and normalized text are kept
+    preprocess_cache = PreprocessCache()
+    with normalizer_pool(LDA_STOPWORDS) if PREPROCESS_WORKERS > 1 else nullcontext() as pool:
+        df_processed = load_processed(ARTICLES_PATH, ['title', 'content'], lambda chunk: preprocess_for_lda(
+            chunk, cache=preprocess_cache, pool=pool).drop(columns='content'))
+    preprocess_cache.report()
+    preprocess_cache.close()
 
     # setting
     n_topics = 5
+    doc_topic_prior = 0.5
     n_words = 6
     n_phrases = 10
-    lda_models, vectorizers, feature_names_sets, document_topics = perform_lda_analysis(df_processed, n_topics=n_topics)
 
-
-    display_topics(lda_models, feature_names_sets, n_words, n_phrases)
-    article_topics = analyze_document_topics(document_topics, df_processed)
+    # incremental: new articles only, unless drift calls for a full refit
+    refit = True
+    if INCREMENTAL and os.path.exists(LDA_STATE):
+        state = TopicState.load(LDA_STATE)
+        keys = document_keys(df_processed['clean_text'])
+        is_new = [state.is_new(key) for key in keys]
+        df_new = df_processed[is_new]
+        if len(df_new) == 0:
+            print("No new articles.")
+            refit = False
+        else:
+            document_topics, report = state.update(df_new['clean_text'], [key for key, new in zip(keys, is_new) if new])
+            if report['refit']:
+                print(f"Full refit: {', '.join(report['reasons'])}")
+            else:
+                state.save(LDA_STATE)
+                analyze_document_topics(document_topics, df_new, 'new_article_topics.csv', 'new_topic_distribution.txt')
+                print(f"Updated the saved models with {len(df_new)} new articles.")
+                refit = False
+
+    if refit:
+        # one tokenization pass gives both count matrices
+        counts = count_vectorize(df_processed['clean_text'], COUNT_CONFIGS)
+
+        if MODEL_SELECTION:
+            selection, wall = select_topics(counts['word'][1], TOPIC_GRID, PRIOR_GRID, SELECTION_WORKERS)
+            selection.to_csv(f"{output_dir}/lda_model_selection.csv", index=False)
+            n_topics, doc_topic_prior = best_config(selection)
+            print(selection.round(3).to_string(index=False))
+            print(f"\n{len(selection)} configurations in {wall:.1f}s "
+                  f"(sum of fits {selection['fit_seconds'].sum():.1f}s); best: K={n_topics}, prior={doc_topic_prior}")
+
+        lda_models, vectorizers, feature_names_sets, model_document_topics = perform_lda_analysis(
+            counts, n_topics=n_topics, doc_topic_prior=doc_topic_prior)
+        document_topics = (model_document_topics[0] + model_document_topics[1]) / 2
+
+        # saved for incremental runs; drift baselines from the fit's counts and document topics
+        TopicState(zip(['word', 'phrase'], lda_models), zip(['word', 'phrase'], vectorizers), n_topics,
+                   doc_topic_prior, document_keys(df_processed['clean_text']), counts,
+                   dict(zip(['word', 'phrase'], model_document_topics))).save(LDA_STATE)
+
+        display_topics(lda_models, feature_names_sets, n_words, n_phrases)
+
+        # coherence from the count matrices of the fit
+        coherence, coherence_text = evaluate_topics(
+            {name: (lda, counts[name][1]) for name, lda in zip(['word', 'phrase'], lda_models)},
+            COHERENCE_TOP_N)
+        coherence.to_csv(f"{output_dir}/topic_coherence.csv", index=False)
+        with open(f"{output_dir}/topic_coherence.txt", "w") as f:
+            f.write(coherence_text)
+        print(coherence_text)
+
+        article_topics = analyze_document_topics(document_topics, df_processed)
     
 print("\nFinishing Processing")
\ No newline at end of file
@@ -0,0 +1,157 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from sink import read_articles
+from textnorm import TFIDF_STOPWORDS, normalize_many
+from tfidf_model import MODEL_DIR, TfidfModel
+
+
+RELATED_INDEX = os.path.join(MODEL_DIR, "related.npz")
+N_TABLES = 16     # independent hash tables; more = better recall, more candidates
+N_BITS = 10       # hyperplanes per table; more = smaller buckets
+PROBES = 1        # also look in buckets at Hamming distance 1 (multi-probe)
+SEED = 42         # fixed, hashes must stay comparable across runs
+RELATED_K = 5
+
+
+# random-projection (sign) LSH over l2-normalized sparse vectors; candidates are
+# re-ranked by exact cosine, so scores are exact and only recall is approximate
+class RelatedIndex:
+
+    def __init__(self, dim, n_tables=N_TABLES, n_bits=N_BITS, probes=PROBES, seed=SEED):
+        self.dim = dim
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.probes = probes
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        self.planes = rng.standard_normal((dim, n_tables * n_bits)).astype(np.float32)
+        self.powers = 1 << np.arange(n_bits, dtype=np.int64)
+
+        self.buckets = [{} for _ in range(n_tables)]
+        self._chunks = []
+        self._matrix = sparse.csr_matrix((0, dim))
+
+    def __len__(self):
+        return self._matrix.shape[0] + sum(chunk.shape[0] for chunk in self._chunks)
+
+    @property
+    def matrix(self):
+        if self._chunks:
+            self._matrix = sparse.vstack([self._matrix] + self._chunks, format="csr")
+            self._chunks = []
+        return self._matrix
+
+    # (n, n_tables) bucket keys
+    def _keys(self, vectors):
+        bits = np.asarray(vectors @ self.planes) > 0
+        return bits.reshape(-1, self.n_tables, self.n_bits) @ self.powers
+
+    # incremental insert; returns the new row ids
+    def add(self, vectors):
+        return self._insert(normalize(sparse.csr_matrix(vectors, dtype=np.float64)))
+
+    def _insert(self, vectors):
+        first = len(self)
+        for offset, keys in enumerate(self._keys(vectors)):
+            for table, key in enumerate(keys.tolist()):
+                self.buckets[table].setdefault(key, []).append(first + offset)
+        self._chunks.append(vectors)
+        return np.arange(first, first + vectors.shape[0])
+
+    def _candidates(self, keys):
+        found = set()
+        for table, key in enumerate(keys.tolist()):
+            bucket = self.buckets[table]
+            found.update(bucket.get(key, ()))
+            if self.probes:
+                for bit in self.powers.tolist():
+                    found.update(bucket.get(key ^ bit, ()))
+        return found
+
+    # top-k (row, cosine) for each query vector
+    def query(self, vectors, k=RELATED_K, exclude=None):
+        vectors = normalize(sparse.csr_matrix(vectors, dtype=np.float64))
+        matrix = self.matrix
+        results = []
+        for i, keys in enumerate(self._keys(vectors)):
+            found = self._candidates(keys)
+            if exclude is not None:
+                found.discard(exclude[i])
+            if not found:
+                results.append([])
+                continue
+            candidates = np.fromiter(found, dtype=np.int64, count=len(found))
+            scores = np.asarray((matrix[candidates] @ vectors[i].T).todense()).ravel()
+            order = np.lexsort((candidates, -scores))[:k]
+            results.append([(int(candidates[j]), float(scores[j])) for j in order if scores[j] > 0])
+        return results
+
+    # neighbours of rows already in the index
+    def related(self, rows, k=RELATED_K):
+        rows = np.asarray(rows)
+        return self.query(self.matrix[rows], k, exclude=rows)
+
+    def save(self, path=RELATED_INDEX):
+        matrix = self.matrix
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                 config=np.array([self.dim, self.n_tables, self.n_bits, self.probes, self.seed]))
+        os.replace(tmp_path, path)
+
+    # buckets are rebuilt from the stored vectors (same seed -> same hyperplanes)
+    @classmethod
+    def load(cls, path=RELATED_INDEX):
+        with np.load(path) as f:
+            dim, n_tables, n_bits, probes, seed = f["config"].tolist()
+            matrix = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=(len(f["indptr"]) - 1, dim))
+        index = cls(dim, n_tables, n_bits, probes, seed)
+        index._insert(matrix)  # stored normalized already
+        return index
+
+
+# "related articles" table: the k nearest articles of every article
+def related_table(index, titles, k=RELATED_K, batch=1000):
+    titles = list(titles)
+    rows = []
+    for start in range(0, len(index), batch):
+        ids = np.arange(start, min(start + batch, len(index)))
+        for doc, hits in zip(ids, index.related(ids, k)):
+            rows.append({
+                'article_id': doc + 1,
+                'title': titles[doc],
+                'related_ids': ',\n'.join(str(hit + 1) for hit, _ in hits),
+                'related_titles': ',\n'.join(titles[hit] for hit, _ in hits),
+                'similarity': ',\n'.join(f"{score:.3f}" for _, score in hits),
+            })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Related-articles index over the saved TF-IDF vectors.")
+    parser.add_argument("--index", default=RELATED_INDEX)
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="insert newly scraped articles (scored with the saved model)")
+    add.add_argument("articles")
+    add.add_argument("--model", default=os.path.join(MODEL_DIR, "per"))
+    related = sub.add_parser("related", help="articles related to an article_id")
+    related.add_argument("article_id", type=int)
+    related.add_argument("-k", type=int, default=RELATED_K)
+    args = parser.parse_args()
+
+    index = RelatedIndex.load(args.index)
+    if args.command == "add":
+        df = read_articles(args.articles, ["content"])
+        vectors = TfidfModel.load(args.model).transform(normalize_many(df["content"], TFIDF_STOPWORDS, raw=False))
+        ids = index.add(vectors)
+        index.save(args.index)
+        print(f"Added {len(ids)} articles as {ids[0] + 1}..{ids[-1] + 1} ({len(index)} indexed)" if len(ids)
+              else "Nothing to add")
+    else:
+        for hit, score in index.related([args.article_id - 1], args.k)[0]:
+            print(f"{hit + 1:6d}  {score:.4f}")
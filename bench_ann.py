@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import normalize
+
+from ann import RELATED_K, RelatedIndex
+from tfidf_model import MODEL_DIR, TfidfModel
+
+
+MODEL_PATH = sys.argv[1] if len(sys.argv) > 1 else os.path.join(MODEL_DIR, "per")
+OUTPUT_PATH = "Part02_TF-IDF_Result/ANN Benchmark.csv"
+QUERIES = 500
+SETTINGS = [  # (tables, bits, probes)
+    (4, 12, 0), (8, 12, 0), (8, 10, 0), (8, 10, 1), (16, 10, 1), (16, 8, 1),
+]
+
+
+# exact baseline: full cosine row for each query, top-k excluding the query itself
+def exact_related(matrix, rows, k):
+    results = []
+    for row in rows:
+        scores = np.asarray((matrix @ matrix[row].T).todense()).ravel()
+        scores[row] = 0
+        order = np.lexsort((np.arange(len(scores)), -scores))[:k]
+        results.append([int(i) for i in order if scores[i] > 0])
+    return results
+
+
+def recall(approx, exact):
+    found = sum(len(set(a) & set(e)) for a, e in zip(approx, exact))
+    total = sum(len(e) for e in exact)
+    return found / total if total else 1.0
+
+
+if __name__ == "__main__":
+    matrix = normalize(TfidfModel.load(MODEL_PATH, mmap=False).matrix.tocsr())
+    rng = np.random.RandomState(0)
+    rows = rng.choice(matrix.shape[0], min(QUERIES, matrix.shape[0]), replace=False)
+    print(f"{matrix.shape[0]} articles, {matrix.shape[1]} features, {len(rows)} queries, k={RELATED_K}")
+
+    start = time.perf_counter()
+    exact = exact_related(matrix, rows, RELATED_K)
+    exact_ms = 1000 * (time.perf_counter() - start) / len(rows)
+
+    report = [{"index": "exact", "recall": 1.0, "ms/query": exact_ms, "candidates/query": matrix.shape[0] - 1}]
+    for tables, bits, probes in SETTINGS:
+        start = time.perf_counter()
+        index = RelatedIndex(matrix.shape[1], tables, bits, probes)
+        index.add(matrix)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx = [[hit for hit, _ in hits] for hits in index.related(rows, RELATED_K)]
+        query_ms = 1000 * (time.perf_counter() - start) / len(rows)
+        candidates = np.mean([len(index._candidates(keys)) - 1 for keys in index._keys(matrix[rows])])
+        report.append({"index": f"lsh {tables}x{bits} probes={probes}", "recall": recall(approx, exact),
+                       "ms/query": query_ms, "candidates/query": candidates, "build s": build_s})
+
+    report = pd.DataFrame(report).set_index("index")
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    report.to_csv(OUTPUT_PATH)
+    print("\n" + "=" * 50)
+    print(report.round(3))
+    print("=" * 50)
@@ -0,0 +1,89 @@
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from extract import PARSERS, extract_article, resolve_parser
+
+
+# saved article pages: the HTTP cache bodies, or any folder of .html files
+PAGES_DIR = sys.argv[1] if len(sys.argv) > 1 else "Part01_Cache"
+REPEAT = 5
+output_path = "Part01_Result/Parse Benchmark.csv"
+
+
+def load_pages(pages_dir):
+    paths = sorted(glob.glob(os.path.join(pages_dir, "*.body")) + glob.glob(os.path.join(pages_dir, "*.html")))
+    pages = []
+    for path in paths:
+        with open(path, "rb") as f:
+            pages.append(f.read().decode("utf-8", errors="replace"))
+    return pages
+
+
+def bench(pages, parser, restricted):
+    info = {"title": "", "url": "", "page": 0}
+
+    # time per article, best of REPEAT runs to cut scheduler noise
+    timings = []
+    for html in pages:
+        best = None
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            extract_article(html, info, parser, restricted)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+
+    # peak python memory per article, measured separately (tracemalloc slows parsing)
+    peaks = []
+    results = []
+    for html in pages:
+        tracemalloc.start()
+        results.append(extract_article(html, info, parser, restricted))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    return timings, peaks, results
+
+
+if __name__ == "__main__":
+    pages = load_pages(PAGES_DIR)
+    if not pages:
+        print(f"Error: no saved pages in {PAGES_DIR}")
+        sys.exit(1)
+    print(f"Loaded {len(pages)} saved pages.")
+
+    rows = []
+    baseline = None
+    for parser in PARSERS:
+        if resolve_parser(parser) != parser:
+            continue
+        for restricted in (False, True):
+            if restricted and parser == "html5lib":
+                continue  # html5lib ignores parse_only
+            timings, peaks, results = bench(pages, parser, restricted)
+            if baseline is None:
+                baseline = results
+            rows.append({
+                "parser": parser,
+                "mode": "restricted" if restricted else "full",
+                "median_ms": 1000 * statistics.median(timings),
+                "mean_ms": 1000 * statistics.mean(timings),
+                "peak_mem_kb": statistics.median(peaks) / 1024,
+                "same_output": results == baseline,
+            })
+
+    report = pd.DataFrame(rows)
+    report["speedup"] = report["median_ms"].iloc[0] / report["median_ms"]
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    report.to_csv(output_path, index=False)
+
+    print("\n" + "=" * 50)
+    print("Parse time and memory per article:")
+    print(report.round(3).to_string(index=False))
+    print("=" * 50)
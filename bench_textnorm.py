@@ -0,0 +1,71 @@
+import re
+import sys
+import time
+
+import pandas as pd
+from nltk.stem import WordNetLemmatizer
+
+from corpus_store import load_corpus
+from textnorm import PREPROCESS_WORKERS, TFIDF_STOPWORDS, TextNormalizer, normalize_many
+
+
+ARTICLES_PATH = sys.argv[1] if len(sys.argv) > 1 else "Articles_Coffee.csv"
+REPEAT = 3
+CHUNK_SIZE = 100  # small chunks so the pool is used on a modest corpus
+
+
+# the per-document code textnorm replaced, kept here as the baseline
+def legacy_process_text(text, lemmatizer, common_words):
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    text = re.sub(r'[0-9]+', '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    words = text.split()
+    return ' '.join([lemmatizer.lemmatize(word) for word in words
+                     if len(word) > 2 and word not in common_words])
+
+
+def throughput(func, texts, n_tokens):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": best, "docs/sec": len(texts) / best, "tokens/sec": n_tokens / best}
+
+
+if __name__ == "__main__":
+    texts = load_corpus(ARTICLES_PATH, columns=['content'])['content'].tolist()
+    n_tokens = sum(len(text.split()) for text in texts if isinstance(text, str))
+    print(f"Loaded {len(texts)} articles, {n_tokens} raw tokens.")
+
+    lemmatizer = WordNetLemmatizer()
+    lemmatizer.lemmatize("coffee")
+    common_words = list(TFIDF_STOPWORDS)
+    normalizer = TextNormalizer(TFIDF_STOPWORDS)
+
+    # same output first, then speed
+    legacy = [legacy_process_text(text, lemmatizer, common_words) for text in texts]
+    assert legacy == [normalizer.lemmatized(text) for text in texts], "textnorm output differs from the legacy path"
+
+    rows = {
+        "legacy (list stopwords, 2x re.sub, no cache)": throughput(lambda t: legacy_process_text(t, lemmatizer, common_words), texts, n_tokens),
+        "textnorm (lemmatized only)": throughput(normalizer.lemmatized, texts, n_tokens),
+        "textnorm (lemmatized + raw, one pass)": throughput(normalizer.normalize, texts, n_tokens),
+    }
+    # chunked process pool, serial output must match exactly
+    serial = normalize_many(texts, TFIDF_STOPWORDS, workers=1)
+    for workers in sorted({1, 2, PREPROCESS_WORKERS}):
+        assert normalize_many(texts, TFIDF_STOPWORDS, workers=workers, chunk_size=CHUNK_SIZE) == serial
+        rows[f"normalize_many, {workers} worker(s)"] = throughput(
+            lambda _: normalize_many(texts, TFIDF_STOPWORDS, workers=workers, chunk_size=CHUNK_SIZE), [None], n_tokens)
+        rows[f"normalize_many, {workers} worker(s)"]["docs/sec"] *= len(texts)
+
+    report = pd.DataFrame(rows).T
+    print("\n" + "=" * 50)
+    print(report.round(1))
+    print(f"Lemma cache: {normalizer.cache_info()}")
+    print("=" * 50)
@@ -0,0 +1,205 @@
+import argparse
+import json
+import mmap
+import os
+import shutil
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from sink import FIELDS, READ_CHUNKSIZE, iter_articles, read_articles, swap_dir
+
+
+CORPUS_PATH = "Articles_Coffee.corpus"
+FORMAT_VERSION = 1
+INT_COLUMNS = {"source_page"}
+
+
+# Columnar layout, one directory:
+#   meta.json              row count + column types
+#   <col>.offsets.npy      int64[rows + 1], byte offsets into <col>.data
+#   <col>.data             utf-8 text of every row, back to back
+#   <col>.values.npy       int64[rows] for integer columns
+# append=True starts from a copy of the existing store's bytes and offsets (no re-parsing)
+class CorpusWriter:
+
+    def __init__(self, path=CORPUS_PATH, columns=FIELDS, append=False):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.columns = list(columns)
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+
+        existing = CorpusStore(path) if append and os.path.exists(os.path.join(path, "meta.json")) else None
+        if existing is not None and existing.columns != self.columns:
+            raise ValueError(f"Cannot append to {path}: columns {existing.columns} differ")
+        self.rows = len(existing) if existing is not None else 0
+        self.data_files = {}
+        self.offsets = {}
+        self.values = {}
+        for col in self.columns:
+            if col in INT_COLUMNS:
+                self.values[col] = array("q", existing.values(col).tolist() if existing is not None else [])
+            else:
+                data_path = os.path.join(self.tmp_path, f"{col}.data")
+                if existing is not None:
+                    shutil.copyfile(os.path.join(path, f"{col}.data"), data_path)
+                self.data_files[col] = open(data_path, "ab")
+                self.offsets[col] = array("q", existing.offsets(col).tolist() if existing is not None else [0])
+
+    def write(self, article):
+        for col in self.columns:
+            value = article.get(col)
+            if col in INT_COLUMNS:
+                self.values[col].append(int(value) if pd.notna(value) else -1)
+            else:
+                # the CSV reader turns numeric-looking text into numbers
+                encoded = (value if isinstance(value, str) else str(value) if pd.notna(value) else "").encode("utf-8")
+                self.data_files[col].write(encoded)
+                self.offsets[col].append(self.offsets[col][-1] + len(encoded))
+        self.rows += 1
+
+    def close(self):
+        for col, f in self.data_files.items():
+            f.close()
+            np.save(os.path.join(self.tmp_path, f"{col}.offsets.npy"), np.frombuffer(self.offsets[col], dtype=np.int64))
+        for col, values in self.values.items():
+            np.save(os.path.join(self.tmp_path, f"{col}.values.npy"), np.frombuffer(values, dtype=np.int64))
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "rows": self.rows,
+            "columns": {col: "int" if col in INT_COLUMNS else "str" for col in self.columns},
+        }
+        with open(os.path.join(self.tmp_path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+        swap_dir(self.tmp_path, self.path)
+
+
+# memory-mapped reader; only the columns asked for are ever touched
+class CorpusStore:
+
+    def __init__(self, path=CORPUS_PATH):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus format version: {meta['version']}")
+        self.rows = meta["rows"]
+        self.types = meta["columns"]
+        self.columns = list(self.types)
+        self._maps = {}
+
+    def __len__(self):
+        return self.rows
+
+    def offsets(self, col):
+        return np.load(os.path.join(self.path, f"{col}.offsets.npy"))
+
+    def values(self, col):
+        return np.load(os.path.join(self.path, f"{col}.values.npy"))
+
+    def _text(self, col):
+        if col not in self._maps:
+            offsets = np.load(os.path.join(self.path, f"{col}.offsets.npy"), mmap_mode="r")
+            data_path = os.path.join(self.path, f"{col}.data")
+            if os.path.getsize(data_path) == 0:
+                data = b""
+            else:
+                with open(data_path, "rb") as f:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[col] = (offsets, data)
+        return self._maps[col]
+
+    # one value, without decoding the rest of the column
+    def get(self, col, i):
+        if self.types[col] == "int":
+            return int(np.load(os.path.join(self.path, f"{col}.values.npy"), mmap_mode="r")[i])
+        offsets, data = self._text(col)
+        return data[offsets[i]:offsets[i + 1]].decode("utf-8")
+
+    def column(self, col):
+        if self.types[col] == "int":
+            return np.load(os.path.join(self.path, f"{col}.values.npy"))
+        offsets, data = self._text(col)
+        bounds = offsets.tolist()
+        return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(self.rows)]
+
+    # rows [start, stop) of one column
+    def slice(self, col, start, stop):
+        if self.types[col] == "int":
+            return np.array(np.load(os.path.join(self.path, f"{col}.values.npy"), mmap_mode="r")[start:stop])
+        offsets, data = self._text(col)
+        bounds = offsets[start:stop + 1].tolist()
+        return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+    # DataFrame chunks of at most chunksize rows
+    def iter_chunks(self, columns=None, chunksize=READ_CHUNKSIZE):
+        columns = columns or self.columns
+        for start in range(0, self.rows, chunksize):
+            stop = min(start + chunksize, self.rows)
+            yield pd.DataFrame({col: self.slice(col, start, stop) for col in columns},
+                               index=pd.RangeIndex(start, stop))
+
+    def to_dataframe(self, columns=None):
+        columns = columns or self.columns
+        return pd.DataFrame({col: self.column(col) for col in columns})
+
+
+def import_csv(csv_path, store_path=CORPUS_PATH):
+    writer = CorpusWriter(store_path)
+    for chunk in iter_articles(csv_path):
+        for article in chunk.to_dict("records"):
+            writer.write(article)
+    writer.close()
+    return writer.rows
+
+
+def export_csv(store_path, csv_path):
+    store = CorpusStore(store_path)
+    store.to_dataframe().to_csv(csv_path, index=False, encoding="utf-8")
+    return len(store)
+
+
+def store_is_current(articles_path, store_path=CORPUS_PATH):
+    meta_path = os.path.join(store_path, "meta.json")
+    return os.path.exists(meta_path) and (
+        not os.path.exists(articles_path) or os.path.getmtime(meta_path) >= os.path.getmtime(articles_path))
+
+
+# Part02 entry point: the columnar store when it is current, else the article file
+def load_corpus(articles_path, columns=None, store_path=CORPUS_PATH):
+    if store_is_current(articles_path, store_path):
+        return CorpusStore(store_path).to_dataframe(columns)
+    return read_articles(articles_path, columns)
+
+
+# load_corpus for per-document preprocessing: process() turns each chunk into a smaller
+# frame (e.g. normalized text in place of the raw content), so the raw columns are never
+# all in memory at once; the row index runs on across chunks
+def load_processed(articles_path, columns, process, chunksize=READ_CHUNKSIZE, store_path=CORPUS_PATH):
+    parts = [process(chunk) for chunk in iter_corpus(articles_path, columns, chunksize, store_path)]
+    return pd.concat(parts) if parts else process(pd.DataFrame(columns=columns))
+
+
+# same source choice as load_corpus, one DataFrame chunk at a time
+def iter_corpus(articles_path, columns=None, chunksize=READ_CHUNKSIZE, store_path=CORPUS_PATH):
+    if store_is_current(articles_path, store_path):
+        yield from CorpusStore(store_path).iter_chunks(columns, chunksize)
+    else:
+        yield from iter_articles(articles_path, columns, chunksize)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between the article CSV/JSONL and the columnar corpus store.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(f"Imported {import_csv(args.source, args.target)} articles into {args.target}")
+    else:
+        print(f"Exported {export_csv(args.source, args.target)} articles to {args.target}")
@@ -0,0 +1,94 @@
+import re
+import sqlite3
+import zlib
+
+import numpy as np
+
+
+DEDUP_DB = "Part01_Dedup.db"
+SHINGLE_SIZE = 5       # words per shingle
+NUM_PERM = 128         # minhash permutations
+BANDS = 16             # 16 bands x 8 rows: candidates from ~0.7 jaccard
+THRESHOLD = 0.8        # estimated jaccard to call it a duplicate
+SEED = 42              # fixed, signatures must stay comparable across runs
+
+_MERSENNE = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    words = _TOKEN.findall(text.lower())
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+# minhash signatures + LSH banding, persisted in SQLite and mirrored in memory
+class DuplicateIndex:
+
+    def __init__(self, db_path=DEDUP_DB, num_perm=NUM_PERM, bands=BANDS, threshold=THRESHOLD):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        # a*x + b < 2^64 for 32-bit x, so uint64 never overflows
+        rng = np.random.RandomState(SEED)
+        self.a = rng.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS signatures (url TEXT PRIMARY KEY, signature BLOB NOT NULL)")
+        self.conn.commit()
+
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+        for url, blob in self.conn.execute("SELECT url, signature FROM signatures"):
+            self._index(url, np.frombuffer(blob, dtype=np.uint32))
+
+    def signature(self, text):
+        hashes = np.fromiter(shingles(text), dtype=np.uint64)
+        if len(hashes) == 0:
+            return None
+        # (n_perm, n_shingles) permuted hashes, min over shingles
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % _MERSENNE & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _bands(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _index(self, url, signature):
+        self.signatures[url] = signature
+        for band, key in self._bands(signature):
+            self.buckets[band].setdefault(key, []).append(url)
+
+    # best (url, estimated jaccard) at or above the threshold, else None
+    def query(self, signature):
+        candidates = set()
+        for band, key in self._bands(signature):
+            candidates.update(self.buckets[band].get(key, ()))
+        best = None
+        for url in candidates:
+            similarity = float(np.mean(self.signatures[url] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (url, similarity)
+        return best
+
+    # check one article at ingestion; unique ones are added to the index
+    def check(self, url, text):
+        if not isinstance(text, str):
+            return None
+        signature = self.signature(text)
+        if signature is None:
+            return None  # too short to judge (e.g. extraction placeholders)
+        match = self.query(signature)
+        if match is not None and match[0] != url:
+            return match
+        if url not in self.signatures:
+            self._index(url, signature)
+            self.conn.execute("INSERT OR REPLACE INTO signatures (url, signature) VALUES (?, ?)", (url, signature.tobytes()))
+            self.conn.commit()
+        return None
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,136 @@
+import importlib.util
+
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.filter import ElementFilter
+
+
+PARSERS = {
+    "html.parser": None,    # pure python, always there
+    "lxml": "lxml",
+    "html5lib": "html5lib",
+}
+
+# the only regions the extractors look at; everything else (header, nav,
+# sidebar, footer, scripts) is never built into the tree
+REGION_CLASSES = {"entry-title", "entry-meta", "post-date", "cat-links", "entry-content", "post-content", "post"}
+
+CONTENT_SELECTORS = [
+    '.entry-content',
+    '.post-content',
+    'article .content',
+    '.post .entry'
+]
+
+
+# like SoupStrainer, but "article tag OR one of the region classes"
+class RegionFilter(ElementFilter):
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        if name == "article":
+            return True
+        classes = (attrs or {}).get("class") or ""
+        if isinstance(classes, str):
+            classes = classes.split()
+        return any(c in REGION_CLASSES for c in classes)
+
+    def allow_string_creation(self, string):
+        return False
+
+
+ARTICLE_STRAINER = RegionFilter()
+LISTING_STRAINER = SoupStrainer("article")
+
+
+# fall back to html.parser if the backend is not installed
+def resolve_parser(parser):
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser backend: {parser}")
+    module = PARSERS[parser]
+    if module and importlib.util.find_spec(module) is None:
+        print(f"Parser '{parser}' not installed, using html.parser")
+        return "html.parser"
+    return parser
+
+
+def make_soup(html, parser="html.parser", strainer=None):
+    # html5lib always builds the full tree
+    if strainer is None or parser == "html5lib":
+        return BeautifulSoup(html, parser)
+    return BeautifulSoup(html, parser, parse_only=strainer)
+
+
+# listing page -> [{"title", "url", "page"}], plus failures
+def extract_links(html, page, parser="html.parser", restricted=False):
+    soup = make_soup(html, parser, LISTING_STRAINER if restricted else None)
+
+    article_elements = soup.select('article.post')
+    if not article_elements:
+        article_elements = soup.select('article')
+
+    print(f"Getting {len(article_elements)} articles.")
+
+    article_links = []
+    failure_count = 0
+    for article in article_elements:
+        try:
+            # title + link
+            title_element = article.select_one('h2 a, h1 a, .entry-title a')
+            if not title_element:
+                continue
+
+            title = title_element.text.strip()
+            link = title_element['href']
+
+            # store link
+            article_links.append({"title": title, "url": link, "page": page})
+        except Exception as e:
+            failure_count += 1
+            print(f"❌ Article Scraping Fail : {e}")
+            continue
+
+    return article_links, failure_count
+
+
+# article page -> article record
+def extract_article(html, article_info, parser="html.parser", restricted=False):
+    article_soup = make_soup(html, parser, ARTICLE_STRAINER if restricted else None)
+
+    # title
+    title_element = article_soup.select_one('h1.entry-title')
+    title = title_element.text.strip() if title_element else article_info['title']
+
+    # date
+    date_element = article_soup.select_one('.entry-meta .entry-date, .post-date')
+    date = date_element.text.strip() if date_element else "No date available"
+
+    # dategory
+    category_elements = article_soup.select('.entry-meta .entry-categories a, .cat-links a')
+    categories = ", ".join([cat.text.strip() for cat in category_elements]) if category_elements else "No category available"
+
+    # content
+    content = ""
+    # different container
+    for selector in CONTENT_SELECTORS:
+        content_element = article_soup.select_one(selector)
+        if content_element:
+            # combine paragraphs
+            paragraphs = content_element.select('p')
+            if paragraphs:
+                content = "\n".join([p.text.strip() for p in paragraphs])
+                break
+            else:
+                content = content_element.text.strip()
+                break
+
+    if not content:
+        content = "Getting Article Error"
+
+    return {
+        "title": title,
+        "url": article_info['url'],
+        "date": date,
+        "categories": categories,
+        "content": content,
+        "source_page": article_info['page'],
+        "method": "BeautifulSoup"
+    }
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from politeness import RETRY_STATUSES, THROTTLE_STATUSES, RateController, RetryPolicy, parse_retry_after
+
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+MAX_WORKERS = 8       # requests in flight
+PER_HOST_LIMIT = 4    # requests in flight against one host
+
+
+# concurrent fetching: thread pool + one pooled keep-alive session
+class Fetcher:
+
+    def __init__(self, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, headers=None, timeout=None, cache=None, recorder=None, retry=None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout  # None: adapt to each host's latency
+        self.retry = retry or RetryPolicy()
+        self.cache = cache
+        self.recorder = recorder  # e.g. replay.ArchiveWriter
+
+        # connection pool sized to the workers, so sockets are reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(headers or HEADERS)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    # per host: concurrency slot + rate controller
+    def _host(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (threading.BoundedSemaphore(self.per_host), RateController())
+            return self._hosts[host]
+
+    # blocking fetch, limited per host
+    # revalidate=True always checks a cached copy with the server (listing pages)
+    def get(self, url, revalidate=False):
+        if self.cache is None:
+            return self._download(url)
+
+        cached = self.cache.lookup(url)
+        if cached is None:
+            self.cache.count("misses")
+            response = self._download(url)
+            self.cache.store(url, response)
+            return response
+
+        meta, body = cached
+        if not revalidate and self.cache.is_fresh(meta):
+            self.cache.count("hits")
+            return self.cache.to_response(meta, body)
+
+        # stale: ask the server whether our copy still holds
+        response = self._download(url, self.cache.conditional_headers(meta))
+        if response.status_code == 304:
+            self.cache.count("revalidated")
+            self.cache.refresh(url, meta)
+            return self.cache.to_response(meta, body)
+
+        self.cache.count("misses")
+        self.cache.store(url, response)
+        return response
+
+    # paced by the host's rate controller; transient failures are retried
+    def _download(self, url, headers=None):
+        slot, controller = self._host(url)
+        attempt = 0
+        while True:
+            controller.acquire()
+            self.retry.count("requests")
+            start = time.perf_counter()
+            try:
+                with slot:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout or controller.timeout())
+            except (requests.ConnectionError, requests.Timeout):
+                controller.on_error()
+                if not self.retry.allow(attempt):
+                    raise
+                time.sleep(self.retry.backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES:
+                controller.on_success(time.perf_counter() - start)
+                break
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status_code in THROTTLE_STATUSES:
+                self.retry.count("throttled")
+                controller.on_throttle(retry_after)
+            else:
+                controller.on_error()
+            if not self.retry.allow(attempt):
+                break
+            time.sleep(self.retry.backoff(attempt, retry_after))
+            attempt += 1
+
+        response.raise_for_status()
+        if self.recorder is not None and response.status_code == 200:
+            self.recorder.add(url, response)
+        return response
+
+    def summary(self):
+        stats = dict(self.retry.stats)
+        stats["rates"] = {host: round(controller.rate, 2) for host, (_, controller) in self._hosts.items()}
+        return stats
+
+    def submit(self, url):
+        return self.executor.submit(self.get, url)
+
+    # fetch urls concurrently, yield (url, response, error) in input order;
+    # at most `window` responses are held at once, so memory stays bounded
+    def map(self, urls, window=None):
+        window = window or 2 * self.max_workers
+        pending = deque()
+        for url in urls:
+            pending.append((url, self.submit(url)))
+            if len(pending) >= window:
+                yield self._result(*pending.popleft())
+        while pending:
+            yield self._result(*pending.popleft())
+
+    def _result(self, url, future):
+        try:
+            return url, future.result(), None
+        except Exception as e:
+            return url, None, e
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,93 @@
+import sqlite3
+import time
+
+
+FRONTIER_DB = "Part01_Frontier.db"
+MAX_ATTEMPTS = 3
+
+# url states
+DISCOVERED = "discovered"
+FETCHED = "fetched"
+PARSED = "parsed"
+FAILED = "failed"
+DUPLICATE = "duplicate"
+
+
+# persistent crawl frontier: every article url and how far it got
+class Frontier:
+
+    def __init__(self, db_path=FRONTIER_DB, max_attempts=MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                page INTEGER,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT,
+                error TEXT,
+                discovered_at REAL,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_urls_state ON urls(state)")
+        self.conn.commit()
+
+    # returns True if the url was not known before
+    def add(self, url, title, page):
+        now = time.time()
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO urls (url, title, page, state, discovered_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, title, page, DISCOVERED, now, now),
+        )
+        self.conn.commit()
+        return cursor.rowcount == 1
+
+    def mark_fetched(self, url, content_hash):
+        self.conn.execute(
+            "UPDATE urls SET state = ?, attempts = attempts + 1, content_hash = ?, error = NULL, updated_at = ? WHERE url = ?",
+            (FETCHED, content_hash, time.time(), url),
+        )
+        self.conn.commit()
+
+    def mark_failed(self, url, error):
+        self.conn.execute(
+            "UPDATE urls SET state = ?, attempts = attempts + 1, error = ?, updated_at = ? WHERE url = ?",
+            (FAILED, str(error), time.time(), url),
+        )
+        self.conn.commit()
+
+    # parsed = written to the article csv
+    def mark_parsed(self, urls):
+        now = time.time()
+        self.conn.executemany(
+            "UPDATE urls SET state = ?, updated_at = ? WHERE url = ?",
+            [(PARSED, now, url) for url in urls],
+        )
+        self.conn.commit()
+
+    # near-duplicate content of an article we already have
+    def mark_duplicate(self, url, original_url):
+        self.conn.execute(
+            "UPDATE urls SET state = ?, error = ?, updated_at = ? WHERE url = ?",
+            (DUPLICATE, f"duplicate of {original_url}", time.time(), url),
+        )
+        self.conn.commit()
+
+    # everything not yet parsed, including leftovers of an interrupted run
+    def pending(self):
+        rows = self.conn.execute(
+            "SELECT url, title, page FROM urls WHERE state NOT IN (?, ?) AND attempts < ? ORDER BY page, discovered_at",
+            (PARSED, DUPLICATE, self.max_attempts),
+        ).fetchall()
+        return [{"title": title, "url": url, "page": page} for url, title, page in rows]
+
+    def counts(self):
+        rows = self.conn.execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall()
+        return dict(rows)
+
+    def close(self):
+        self.conn.close()
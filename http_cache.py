@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+CACHE_DIR = "Part01_Cache"
+FRESH_TTL = 6 * 3600            # serve from disk without asking the server
+MAX_AGE = 30 * 24 * 3600        # drop entries not used for this long
+MAX_BYTES = 200 * 1024 * 1024   # total body size kept on disk
+
+
+# on-disk response cache keyed by URL, revalidated with conditional GET
+class HttpCache:
+
+    def __init__(self, cache_dir=CACHE_DIR, fresh_ttl=FRESH_TTL, max_age=MAX_AGE, max_bytes=MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.fresh_ttl = fresh_ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def lookup(self, url):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        # mark as recently used for eviction
+        os.utime(body_path)
+        return meta, body
+
+    def is_fresh(self, meta):
+        return time.time() - meta["stored_at"] < self.fresh_ttl
+
+    # headers for a conditional GET against a cached entry
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, url, response):
+        meta_path, body_path = self._paths(url)
+        meta = {
+            "url": response.url,
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        self._write(body_path, response.content)
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+        self.count("stored")
+
+    # 304: keep the body, restart the freshness clock
+    def refresh(self, url, meta):
+        meta_path, _ = self._paths(url)
+        meta["stored_at"] = time.time()
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def _write(self, path, data):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def to_response(self, meta, body):
+        response = requests.Response()
+        response.status_code = meta.get("status_code", 200)
+        response.url = meta["url"]
+        response.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        response.encoding = meta.get("encoding")
+        response._content = body
+        return response
+
+    # drop expired entries, then least recently used until under max_bytes
+    def evict(self):
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".body"):
+                continue
+            body_path = os.path.join(self.cache_dir, name)
+            meta_path = body_path[:-len(".body")] + ".json"
+            try:
+                stat = os.stat(body_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, body_path, meta_path))
+
+        entries.sort()
+        total = sum(size for _, size, _, _ in entries)
+        evicted = 0
+        for used_at, size, body_path, meta_path in entries:
+            if now - used_at < self.max_age and total <= self.max_bytes:
+                continue
+            for path in (body_path, meta_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            evicted += 1
+
+        self.count("evicted", evicted)
+        return evicted
+
+    def summary(self):
+        stats = dict(self.stats)
+        requests_seen = stats["hits"] + stats["revalidated"] + stats["misses"]
+        served = stats["hits"] + stats["revalidated"]
+        stats["hit_rate"] = 100 * served / requests_seen if requests_seen > 0 else 0
+        return stats
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+CHUNK_ROWS = 10_000   # rows densified at a time, at most (rows x longest row) cells
+TIE_DECIMALS = 12     # scores equal to this many decimals are ties (float noise)
+
+
+# top-k columns of every row of a sparse matrix, highest first (ties: lower column first)
+# returns (columns, scores), both (n_rows, k); rows with fewer than k non-zeros are padded with -1 / 0
+def top_k_per_row(matrix, k, chunk_rows=CHUNK_ROWS):
+    matrix = sparse.csr_matrix(matrix)
+    n_rows = matrix.shape[0]
+    top_columns = np.full((n_rows, k), -1, dtype=np.int64)
+    top_scores = np.zeros((n_rows, k), dtype=matrix.dtype)
+
+    for start in range(0, n_rows, chunk_rows):
+        chunk = matrix[start:start + chunk_rows]
+        counts = np.diff(chunk.indptr)
+        width = max(int(counts.max(initial=0)), k)
+
+        # pack each row's stored non-zeros to the left of a (rows, width) block
+        rows = np.repeat(np.arange(chunk.shape[0]), counts)
+        slots = np.arange(chunk.nnz) - np.repeat(chunk.indptr[:-1], counts)
+        values = np.full((chunk.shape[0], width), -np.inf)
+        columns = np.full((chunk.shape[0], width), -1, dtype=np.int64)
+        values[rows, slots] = chunk.data
+        columns[rows, slots] = chunk.indices
+
+        # partial selection of k per row; rows with ties across the k-th place are
+        # fully ordered so the lower column always wins, then only the k are sorted
+        keys = np.round(values, TIE_DECIMALS)
+        picked = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        kth = np.take_along_axis(keys, picked, axis=1).min(axis=1)
+        tied = (keys >= kth[:, None]).sum(axis=1) > k
+        if tied.any():
+            picked[tied] = np.lexsort((columns[tied], -keys[tied]), axis=1)[:, :k]
+        picked_keys = np.take_along_axis(keys, picked, axis=1)
+        picked_columns = np.take_along_axis(columns, picked, axis=1)
+        order = np.lexsort((picked_columns, -picked_keys), axis=1)
+        picked_values = np.take_along_axis(np.take_along_axis(values, picked, axis=1), order, axis=1)
+        picked_columns = np.take_along_axis(picked_columns, order, axis=1)
+
+        empty = np.isneginf(picked_values)
+        picked_values[empty] = 0
+        picked_columns[empty] = -1
+        top_columns[start:start + chunk.shape[0]] = picked_columns
+        top_scores[start:start + chunk.shape[0]] = picked_values
+
+    return top_columns, top_scores
+
+
+# per-article keyword table: one row per document, keywords and scores joined with ",\n"
+def keyword_table(matrix, feature_names, titles, k, first_id=1):
+    top_columns, top_scores = top_k_per_row(matrix, k)
+    feature_names = np.asarray(feature_names, dtype=object)
+
+    keywords = []
+    scores = []
+    for columns, values in zip(top_columns, top_scores):
+        found = columns >= 0
+        keywords.append(',\n'.join(feature_names[columns[found]]))
+        scores.append(',\n'.join([f"{score:.3f}" for score in values[found]]))
+
+    return pd.DataFrame({
+        'article_id': np.arange(first_id, first_id + matrix.shape[0]),
+        'title': list(titles),
+        'top_keywords': keywords,
+        'tfidf_scores': scores,
+    })
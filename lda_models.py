@@ -0,0 +1,183 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import sklearn
+from joblib import effective_n_jobs
+from scipy import sparse
+from sklearn.decomposition import LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.utils import gen_batches
+from sklearn.utils.parallel import Parallel
+
+
+MAX_ITER = 10
+LDA_PARAMS = dict(learning_method='online', random_state=0)
+CORES = os.cpu_count() or 1
+SKLEARN_INTERNALS = ((1, 6), (1, 9))   # checked releases, see uses_internals
+
+LDA_STATE = "Part02_LDA_Result/model/lda_state.joblib"
+STATE_VERSION = 1
+DRIFT_RATIO = 1.3       # new-batch word perplexity / the same at the last full fit
+OOV_RISE = 0.1          # rise in out-of-vocabulary token share that calls for a new vocabulary
+REFIT_GROWTH = 0.5      # refit once the corpus has grown by this share since the last full fit
+
+
+def make_lda(n_topics, doc_topic_prior=0.5, n_jobs=1, max_iter=MAX_ITER):
+    return LatentDirichletAllocation(n_components=n_topics, max_iter=max_iter, n_jobs=n_jobs,
+                                     doc_topic_prior=doc_topic_prior, **LDA_PARAMS)
+
+
+# fitted model + document-topic distributions, computed in the same worker as the fit.
+# LatentDirichletAllocation.fit (online) step by step: its closing E-step over the whole matrix
+# (for bound_) already gives what transform() returns, so it is kept instead of run again.
+# Uses sklearn internals, so only on the releases in SKLEARN_INTERNALS and for a plain online
+# fit; anything else goes through the public fit_transform (same result, one more E-step)
+def fit_lda(matrix, n_topics, doc_topic_prior=0.5, n_jobs=1, max_iter=MAX_ITER):
+    lda = make_lda(n_topics, doc_topic_prior, n_jobs, max_iter)
+    if not uses_internals(lda):
+        return lda, lda.fit_transform(matrix)
+
+    lda._validate_params()
+    matrix = lda._check_non_neg_array(matrix, reset_n_features=True, whom="fit_lda")
+    n_samples = matrix.shape[0]
+    lda._init_latent_vars(matrix.shape[1], dtype=matrix.dtype)
+    with Parallel(n_jobs=effective_n_jobs(n_jobs)) as parallel:
+        for _ in range(max_iter):
+            for batch in gen_batches(n_samples, lda.batch_size):
+                lda._em_step(matrix[batch, :], total_samples=n_samples, batch_update=False, parallel=parallel)
+            lda.n_iter_ += 1
+        document_topics, _ = lda._e_step(matrix, cal_sstats=False, random_init=False, parallel=parallel)
+    lda.bound_ = lda._perplexity_precomp_distr(matrix, document_topics, sub_sampling=False)
+    document_topics /= document_topics.sum(axis=1)[:, np.newaxis]
+    return lda, document_topics
+
+
+# the sklearn LDA internals fit_lda and warm starts rely on are the same in these (major, minor) releases
+def uses_internals(lda):
+    version = tuple(int(part) for part in sklearn.__version__.split(".")[:2])
+    return (SKLEARN_INTERNALS[0] <= version <= SKLEARN_INTERNALS[1]
+            and lda.learning_method == 'online' and lda.evaluate_every <= 0)
+
+
+# split the cores between the models in proportion to their matrix sizes (at least one each)
+def split_cores(matrices, cores=CORES):
+    sizes = [max(1, matrix.nnz) for matrix in matrices]
+    shares = [max(1, int(cores * size / sum(sizes))) for size in sizes]
+    return shares
+
+
+# fit one LDA per matrix side by side, each in its own process with its own share of the cores;
+# returns [(lda, document_topics)] in input order
+def fit_concurrently(matrices, n_topics, doc_topic_prior=0.5, cores=CORES, max_iter=MAX_ITER):
+    jobs = split_cores(matrices, cores)
+    if len(matrices) == 1 or cores < 2:
+        return [fit_lda(matrix, n_topics, doc_topic_prior, n_jobs, max_iter) for matrix, n_jobs in zip(matrices, jobs)]
+    with ProcessPoolExecutor(max_workers=len(matrices)) as pool:
+        futures = [pool.submit(fit_lda, matrix, n_topics, doc_topic_prior, n_jobs, max_iter)
+                   for matrix, n_jobs in zip(matrices, jobs)]
+        return [future.result() for future in futures]
+
+
+# per-word predictive perplexity exp(-sum log p(w|d) / words), p(w|d) = theta_d . beta_w;
+# unlike LatentDirichletAllocation.perplexity it has no corpus-level term, so batches
+# of any size compare with the full corpus. theta: the documents' topics, if already known
+def word_perplexity(lda, matrix, theta=None):
+    counts = sparse.coo_matrix(matrix)
+    if counts.sum() == 0:
+        return float('nan')
+    if theta is None:
+        theta = lda.transform(counts.tocsr())
+    beta = lda.components_ / lda.components_.sum(axis=1)[:, np.newaxis]
+    probs = np.einsum('ij,ji->i', theta[counts.row], beta[:, counts.col])
+    return float(np.exp(-(counts.data * np.log(probs)).sum() / counts.data.sum()))
+
+
+def document_keys(texts):
+    return [hashlib.sha1(text.encode("utf-8")).hexdigest() for text in texts]
+
+
+# saved vectorizers + LDA models of one full fit, updated online with new documents.
+# The vocabulary stays fixed between full fits; new words only show up as a rising
+# out-of-vocabulary share, which (like perplexity drift and corpus growth) triggers a refit.
+class TopicState:
+
+    # counts: {name: count_vectorize result of the fit}, document_topics: {name: the fit's document topics}
+    def __init__(self, models, vectorizers, n_topics, doc_topic_prior, doc_keys, counts, document_topics):
+        self.models = dict(models)
+        self.vectorizers = dict(vectorizers)
+        self.n_topics = n_topics
+        self.doc_topic_prior = doc_topic_prior
+        self.doc_keys = set(doc_keys)
+        self.n_docs = len(self.doc_keys)
+        self.docs_at_fit = self.n_docs
+
+        self.baseline = {}
+        for name in self.vectorizers:
+            _, matrix, n_tokens = counts[name]
+            self.baseline[name] = {
+                'perplexity': word_perplexity(self.models[name], matrix, document_topics[name]),
+                'oov_share': float(1 - matrix.sum() / n_tokens) if n_tokens else 0.0,
+            }
+
+    # share of n-gram tokens the fixed vocabulary does not know
+    def oov_share(self, name, texts):
+        vectorizer = self.vectorizers[name]
+        analyzer = CountVectorizer(ngram_range=vectorizer.ngram_range).build_analyzer()
+        vocabulary = vectorizer.vocabulary
+        vocabulary = vocabulary if isinstance(vocabulary, dict) else set(vocabulary)
+        total = unknown = 0
+        for text in texts:
+            tokens = analyzer(text)
+            total += len(tokens)
+            unknown += sum(token not in vocabulary for token in tokens)
+        return unknown / total if total else 0.0
+
+    def is_new(self, key):
+        return key not in self.doc_keys
+
+    # drift check, then one online pass over the new documents;
+    # returns (combined document topics, report); report['refit'] -> the models were left untouched
+    def update(self, texts, keys):
+        texts = list(texts)
+        matrices = {name: vectorizer.transform(texts) for name, vectorizer in self.vectorizers.items()}
+        report = {'new_documents': len(texts), 'reasons': []}
+        for name, matrix in matrices.items():
+            perplexity = word_perplexity(self.models[name], matrix)
+            oov_share = self.oov_share(name, texts)
+            report[f'{name}_perplexity_ratio'] = perplexity / self.baseline[name]['perplexity']
+            report[f'{name}_oov_rise'] = oov_share - self.baseline[name]['oov_share']
+            if report[f'{name}_perplexity_ratio'] > DRIFT_RATIO:
+                report['reasons'].append(f"{name} perplexity drift")
+            if report[f'{name}_oov_rise'] > OOV_RISE:
+                report['reasons'].append(f"{name} vocabulary growth")
+        if self.n_docs + len(texts) > (1 + REFIT_GROWTH) * self.docs_at_fit:
+            report['reasons'].append("corpus growth")
+        report['refit'] = bool(report['reasons'])
+        if report['refit']:
+            return None, report
+
+        self.n_docs += len(texts)
+        topics = []
+        for name, matrix in matrices.items():
+            lda = self.models[name]
+            lda.total_samples = self.n_docs  # weight of a mini-batch in the online update
+            lda.partial_fit(matrix)
+            topics.append(lda.transform(matrix))
+        self.doc_keys.update(keys)
+        return np.mean(topics, axis=0), report
+
+    def save(self, path=LDA_STATE):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        joblib.dump({'version': STATE_VERSION, 'state': self}, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path=LDA_STATE):
+        saved = joblib.load(path)
+        if saved['version'] != STATE_VERSION:
+            raise ValueError(f"Unsupported LDA state version: {saved['version']}")
+        return saved['state']
@@ -0,0 +1,130 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.special import psi
+from sklearn.utils import check_random_state
+
+from lda_models import MAX_ITER, make_lda, uses_internals
+
+
+SELECTION_WORKERS = os.cpu_count() or 1
+HOLDOUT = 0.2          # share of documents kept out of the fit for perplexity
+SEED = 0
+WARM_ITER = 5          # passes when starting from the neighbouring K's topics
+SPLIT_NOISE = 0.1      # perturbation when one topic is split in two
+
+
+# one (train, test) matrix pair per worker process, set once by the pool initializer
+_worker_data = None
+
+
+def _init_worker(train, test):
+    global _worker_data
+    _worker_data = (train, test)
+
+
+def split_holdout(matrix, holdout=HOLDOUT, seed=SEED):
+    matrix = sparse.csr_matrix(matrix)
+    order = np.random.RandomState(seed).permutation(matrix.shape[0])
+    n_test = max(1, int(round(holdout * matrix.shape[0])))
+    return matrix[order[n_test:]], matrix[order[:n_test]]
+
+
+# n_topics topics from a smaller fitted model: the heaviest topic is split into
+# two perturbed halves until there are enough
+def _split_topics(components, n_topics, seed=SEED):
+    rng = np.random.RandomState(seed)
+    while components.shape[0] < n_topics:
+        heaviest = components.sum(axis=1).argmax()
+        noise = 1 + SPLIT_NOISE * rng.uniform(-1, 1, components.shape[1])
+        halves = np.vstack([components[heaviest] * noise / 2, components[heaviest] * (2 - noise) / 2])
+        components = np.vstack([np.delete(components, heaviest, axis=0), halves])
+    return components
+
+
+def _dirichlet_expectation(alpha):
+    return psi(alpha) - psi(alpha.sum(axis=1))[:, np.newaxis]
+
+
+# fresh model state for the online updates, with the given topics in place of random ones.
+# Outside the sklearn releases uses_internals() knows, the same state comes from one public
+# partial_fit on a single document, whose update and random draws are then undone
+def warm_init(lda, train, components):
+    if uses_internals(lda):
+        lda.n_features_in_ = train.shape[1]
+        lda._init_latent_vars(train.shape[1])
+    else:
+        lda.partial_fit(train[:1])
+        lda.n_batch_iter_ = 1
+        lda.random_state_ = check_random_state(lda.random_state)
+        lda.random_state_.gamma(100.0, 0.01, lda.components_.shape)   # the random topics' draw
+    lda.components_ = components
+    lda.exp_dirichlet_component_ = np.exp(_dirichlet_expectation(components))
+
+
+def _fit_one(n_topics, doc_topic_prior, init_components=None, max_iter=MAX_ITER, warm_iter=WARM_ITER):
+    train, test = _worker_data
+    # n_jobs=1: the pool is the parallelism
+    lda = make_lda(n_topics, doc_topic_prior, n_jobs=1, max_iter=max_iter)
+    start = time.perf_counter()
+    if init_components is None:
+        lda.fit(train)
+        iterations = lda.n_iter_
+    else:
+        # same online updates as fit(), starting from the given topics
+        lda.total_samples = train.shape[0]
+        warm_init(lda, train, _split_topics(init_components, n_topics))
+        for _ in range(warm_iter):
+            lda.partial_fit(train)
+        iterations = warm_iter
+    seconds = time.perf_counter() - start
+    return {
+        'n_topics': n_topics,
+        'doc_topic_prior': doc_topic_prior,
+        'warm_start': init_components is not None,
+        'iterations': iterations,
+        'fit_seconds': seconds,
+        'heldout_perplexity': lda.perplexity(test),
+        'components': lda.components_,
+    }
+
+
+# fit every (K, prior) pair on one document-term matrix and score held-out perplexity;
+# every other K is fitted cold, the rest warm-start from the nearest cold K below,
+# submitted as soon as that one cold fit is done so the pool never waits on a whole phase
+def select_topics(matrix, topic_grid, prior_grid, workers=SELECTION_WORKERS, holdout=HOLDOUT, warm_start=True):
+    train, test = split_holdout(matrix, holdout)
+    topic_grid = sorted(topic_grid)
+    cold = topic_grid[::2] if warm_start else topic_grid
+    children = {c: [] for c in cold}
+    for k in topic_grid:
+        if k not in cold:
+            children[max(c for c in cold if c < k)].append(k)
+
+    start = time.perf_counter()
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(train, test)) as pool:
+        pending = {pool.submit(_fit_one, k, prior): (k, prior) for k in cold for prior in prior_grid}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for job in done:
+                k, prior = pending.pop(job)
+                results[(k, prior)] = job.result()
+                if not results[(k, prior)]['warm_start']:
+                    for child in children[k]:
+                        pending[pool.submit(_fit_one, child, prior, results[(k, prior)]['components'])] = (child, prior)
+    wall = time.perf_counter() - start
+
+    report = pd.DataFrame([{key: value for key, value in result.items() if key != 'components'}
+                           for result in results.values()])
+    report = report.sort_values(['n_topics', 'doc_topic_prior']).reset_index(drop=True)
+    return report, wall
+
+
+def best_config(report):
+    best = report.loc[report['heldout_perplexity'].idxmin()]
+    return int(best['n_topics']), float(best['doc_topic_prior'])
@@ -0,0 +1,146 @@
+import hashlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from extract import extract_article
+
+
+PARSE_WORKERS = os.cpu_count() or 1   # 0 = parse in this process
+QUEUE_SIZE = 32                       # raw pages waiting for a parser, and parses in flight
+
+_DONE = object()
+
+
+# runs in the worker processes
+def _parse(html, article_info, parser, restricted):
+    start = time.perf_counter()
+    article = extract_article(html, article_info, parser, restricted)
+    return article, time.perf_counter() - start
+
+
+# two stages: fetcher threads download raw html into a bounded queue,
+# a process pool turns it into article records
+class ParsePipeline:
+
+    def __init__(self, fetcher, parser="html.parser", restricted=False, workers=PARSE_WORKERS, queue_size=QUEUE_SIZE):
+        self.fetcher = fetcher
+        self.parser = parser
+        self.restricted = restricted
+        self.workers = workers
+        self.queue_size = queue_size
+        self.stats = {
+            "fetched": 0,
+            "fetch_wall_s": 0.0,      # first request to last download
+            "fetch_blocked_s": 0.0,   # downloads waiting on a full queue (parsing is the bottleneck)
+            "parse_starved_s": 0.0,   # parsers waiting on an empty queue (fetching is the bottleneck)
+            "parse_cpu_s": 0.0,       # summed over workers
+            "parse_wall_s": 0.0,
+            "total_wall_s": 0.0,
+        }
+
+    def _feed(self, article_links, raw):
+        start = time.perf_counter()
+        urls = [article_info['url'] for article_info in article_links]
+        for article_info, (_, response, error) in zip(article_links, self.fetcher.map(urls, window=self.queue_size)):
+            if response is not None:
+                item = (article_info, response.text, hashlib.sha1(response.content).hexdigest(), None)
+                self.stats["fetched"] += 1
+            else:
+                item = (article_info, None, None, error)
+            wait_start = time.perf_counter()
+            raw.put(item)
+            self.stats["fetch_blocked_s"] += time.perf_counter() - wait_start
+        self.stats["fetch_wall_s"] = time.perf_counter() - start
+        raw.put(_DONE)
+
+    def _collect(self, item):
+        article_info, content_hash, future, error = item
+        if error is not None:
+            return article_info, content_hash, None, error
+        try:
+            article, elapsed = future.result()
+        except Exception as e:
+            return article_info, content_hash, None, e
+        self.stats["parse_cpu_s"] += elapsed
+        return article_info, content_hash, article, None
+
+    # yields (article_info, content_hash, article, error) in input order
+    def run(self, article_links):
+        start = time.perf_counter()
+        raw = queue.Queue(maxsize=self.queue_size)
+        feeder = threading.Thread(target=self._feed, args=(article_links, raw), daemon=True)
+        feeder.start()
+
+        # spawn, not fork: the fetcher threads are already running
+        pool = None
+        if self.workers > 0:
+            pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+        parse_start = None
+        in_flight = deque()
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                item = raw.get()
+                self.stats["parse_starved_s"] += time.perf_counter() - wait_start
+                if item is _DONE:
+                    break
+
+                article_info, html, content_hash, error = item
+                if parse_start is None:
+                    parse_start = time.perf_counter()
+                if error is not None:
+                    in_flight.append((article_info, content_hash, None, error))
+                elif pool is not None:
+                    future = pool.submit(_parse, html, article_info, self.parser, self.restricted)
+                    in_flight.append((article_info, content_hash, future, None))
+                else:
+                    future = _InlineResult(_parse, html, article_info, self.parser, self.restricted)
+                    in_flight.append((article_info, content_hash, future, None))
+
+                while len(in_flight) >= self.queue_size:
+                    yield self._collect(in_flight.popleft())
+
+            while in_flight:
+                yield self._collect(in_flight.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            # consumer may have stopped early: unblock the feeder
+            while feeder.is_alive():
+                try:
+                    raw.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            feeder.join()
+
+        end = time.perf_counter()
+        self.stats["parse_wall_s"] = end - parse_start if parse_start is not None else 0.0
+        self.stats["total_wall_s"] = end - start
+
+    def report(self):
+        s = self.stats
+        return (f"Pipeline: {s['fetched']} pages, total {s['total_wall_s']:.2f}s | "
+                f"fetch {s['fetch_wall_s']:.2f}s (blocked on parsers {s['fetch_blocked_s']:.2f}s) | "
+                f"parse {s['parse_wall_s']:.2f}s wall, {s['parse_cpu_s']:.2f}s in parsers "
+                f"x{max(self.workers, 1)} (starved {s['parse_starved_s']:.2f}s)")
+
+
+# same interface as a Future, for workers=0
+class _InlineResult:
+
+    def __init__(self, func, *args):
+        try:
+            self._value, self._error = func(*args), None
+        except Exception as e:
+            self._value, self._error = None, e
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._value
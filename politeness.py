@@ -0,0 +1,123 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+# request rate per host (requests/s)
+INITIAL_RATE = 2.0
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+RATE_STEP = 0.5          # additive increase per fast success
+BACKOFF_FACTOR = 0.5     # multiplicative decrease on 429/503
+ERROR_FACTOR = 0.8       # gentler decrease on timeouts and 5xx
+LATENCY_TARGET = 1.5     # seconds; slower answers stop the ramp-up
+
+# adaptive timeout: a multiple of the smoothed latency, clamped
+TIMEOUT_FACTOR = 4
+MIN_TIMEOUT = 5
+MAX_TIMEOUT = 30
+
+# retries: jittered exponential backoff, bounded by a budget
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30.0
+RETRY_BUDGET_RATIO = 0.2   # retries may add at most 20% to the requests sent
+RETRY_BUDGET_MIN = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+
+# Retry-After: delta-seconds or an HTTP date
+def parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# AIMD rate controller for one host
+class RateController:
+
+    def __init__(self, rate=INITIAL_RATE, min_rate=MIN_RATE, max_rate=MAX_RATE):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.latency = None   # EWMA of response time
+        self._next_time = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    # wait for this request's send slot
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time, self._paused_until)
+            self._next_time = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self, latency):
+        with self._lock:
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            if self.latency < LATENCY_TARGET:
+                self.rate = min(self.max_rate, self.rate + RATE_STEP)
+
+    def on_error(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * ERROR_FACTOR)
+
+    # 429/503: halve the rate and hold every request until Retry-After
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def timeout(self):
+        if self.latency is None:
+            return MAX_TIMEOUT
+        return min(MAX_TIMEOUT, max(MIN_TIMEOUT, TIMEOUT_FACTOR * self.latency))
+
+
+# shared across all hosts of one crawl
+class RetryPolicy:
+
+    def __init__(self, max_retries=MAX_RETRIES, base=BACKOFF_BASE, cap=BACKOFF_CAP,
+                 budget_ratio=RETRY_BUDGET_RATIO, budget_min=RETRY_BUDGET_MIN):
+        self.max_retries = max_retries
+        self.base = base
+        self.cap = cap
+        self.budget_ratio = budget_ratio
+        self.budget_min = budget_min
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0, "budget_exhausted": 0}
+        self._lock = threading.Lock()
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    # take a retry from the budget, if this request and the crawl still have one
+    def allow(self, attempt):
+        if attempt >= self.max_retries:
+            return False
+        with self._lock:
+            budget = self.budget_min + self.budget_ratio * self.stats["requests"]
+            if self.stats["retries"] >= budget:
+                self.stats["budget_exhausted"] += 1
+                return False
+            self.stats["retries"] += 1
+            return True
+
+    # full jitter: uniform in [0, min(cap, base * 2^attempt)]
+    def backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
@@ -0,0 +1,99 @@
+import hashlib
+import sqlite3
+import time
+
+
+PREPROCESS_DB = "Part02_Preprocess.db"
+MAX_BYTES = 200 * 1024 * 1024   # normalized text kept on disk
+BATCH = 500                     # keys per SQL statement (SQLite variable limit)
+
+
+# content-addressed store of normalized documents, shared by the Part02 stages
+# key = sha1(normalization fingerprint + document text), so edited articles and
+# changed stopwords/regex/lemmatizer simply miss
+class PreprocessCache:
+
+    def __init__(self, db_path=PREPROCESS_DB, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS documents (
+                key TEXT PRIMARY KEY,
+                lemmatized TEXT NOT NULL,
+                raw TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_used ON documents(used_at)")
+        self.conn.commit()
+
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    @staticmethod
+    def key(fingerprint, text):
+        return hashlib.sha1(f"{fingerprint}\0{text}".encode("utf-8")).hexdigest()
+
+    # {key: (lemmatized, raw)} for the keys we have
+    def get_many(self, keys):
+        keys = list(keys)
+        found = {}
+        for i in range(0, len(keys), BATCH):
+            batch = keys[i:i + BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT key, lemmatized, raw FROM documents WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            found.update((key, (lemmatized, raw)) for key, lemmatized, raw in rows)
+
+        # touch the hits so eviction drops the least recently used first
+        now = time.time()
+        self.conn.executemany("UPDATE documents SET used_at = ? WHERE key = ?", [(now, key) for key in found])
+        self.conn.commit()
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries):
+        if not entries:
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO documents (key, lemmatized, raw, size, used_at) VALUES (?, ?, ?, ?, ?)",
+            [(key, lemmatized, raw, len(lemmatized) + len(raw), now) for key, (lemmatized, raw) in entries.items()],
+        )
+        self.conn.commit()
+        self.stats["stored"] += len(entries)
+        self.evict()
+
+    # least recently used first, until the total fits in max_bytes
+    def evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM documents").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM documents ORDER BY used_at"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM documents WHERE key = ?", doomed)
+        self.conn.commit()
+        self.stats["evicted"] += len(doomed)
+
+    def summary(self):
+        stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = 100 * stats["hits"] / lookups if lookups > 0 else 0
+        stats["entries"] = self.conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return stats
+
+    def report(self):
+        stats = self.summary()
+        print(f"Preprocess cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.1f}% hit rate), {stats['stored']} stored, "
+              f"{stats['evicted']} evicted, {stats['entries']} entries")
+
+    def close(self):
+        self.conn.close()
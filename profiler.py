@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+
+import numpy as np
+import psutil
+
+
+SAMPLE_INTERVAL = 0.2   # seconds between samples
+TRIALS = 3
+
+
+# background sampler for this process and all its children (chromedriver, Chrome)
+class ResourceSampler:
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.root = psutil.Process(os.getpid())
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _tree(self):
+        try:
+            return [self.root] + self.root.children(recursive=True)
+        except psutil.Error:
+            return [self.root]
+
+    def _sample(self):
+        rss = 0
+        threads = 0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    cpu = proc.cpu_times()
+                    rss += proc.memory_info().rss
+                    threads += proc.num_threads()
+                # last seen cpu time per pid, so children that exit early still count
+                self._cpu_by_pid[proc.pid] = cpu.user + cpu.system
+            except psutil.Error:
+                continue
+        self.rss_samples.append(rss)
+        self.thread_samples.append(threads)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.rss_samples = []
+        self.thread_samples = []
+        self._cpu_by_pid = {}
+        self._sample()
+        self._cpu_start = sum(self._cpu_by_pid.values())
+        self._net_start = psutil.net_io_counters()
+        self._wall_start = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        wall = time.perf_counter() - self._wall_start
+        net_end = psutil.net_io_counters()
+        cpu_time = sum(self._cpu_by_pid.values()) - self._cpu_start
+
+        return {
+            "wall_time_s": wall,
+            "cpu_time_s": cpu_time,
+            "cpu_percent": 100 * cpu_time / wall if wall > 0 else 0,
+            "peak_rss_mb": max(self.rss_samples) / 2**20,
+            "mean_rss_mb": float(np.mean(self.rss_samples)) / 2**20,
+            "peak_threads": max(self.thread_samples),
+            "mean_threads": float(np.mean(self.thread_samples)),
+            # psutil has no per-process network counters; these are host-wide
+            "net_sent_bytes": net_end.bytes_sent - self._net_start.bytes_sent,
+            "net_recv_bytes": net_end.bytes_recv - self._net_start.bytes_recv,
+            "samples": len(self.rss_samples),
+        }
+
+
+# run func `trials` times under the sampler; keep the last result
+def run_trials(func, *args, trials=TRIALS, interval=SAMPLE_INTERVAL, **kwargs):
+    measurements = []
+    result = None
+    for trial in range(1, trials + 1):
+        print(f"Trial {trial}/{trials}")
+        sampler = ResourceSampler(interval)
+        sampler.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            measurements.append(sampler.stop())
+    return result, measurements
+
+
+# median and p95 of every metric over the trials
+def summarize(measurements):
+    summary = {}
+    for key in measurements[0]:
+        values = [m[key] for m in measurements]
+        summary[key] = {
+            "median": float(np.median(values)),
+            "p95": float(np.percentile(values, 95)),
+        }
+    return summary
@@ -0,0 +1,177 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+from urllib.parse import urlparse
+
+from extract import extract_links
+from fetcher import Fetcher
+from localserver import LocalHandler, LocalServer
+
+
+ARCHIVE_PATH = "Part01_Result/crawl_archive.zip"
+
+# name: (latency in seconds per response, bandwidth in bytes/s or None)
+PROFILES = {
+    "none": (0.0, None),
+    "lan": (0.002, None),
+    "dsl": (0.05, 2_000_000 // 8),
+    "3g": (0.15, 750_000 // 8),
+}
+
+# not valid any more once the body is stored decoded
+DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+
+def _key(url):
+    parsed = urlparse(url)
+    return parsed.path + (f"?{parsed.query}" if parsed.query else "")
+
+
+# record: every response goes into one deflated zip, index.json maps path -> entry
+class ArchiveWriter:
+
+    def __init__(self, path=ARCHIVE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9)
+        self.index = {}
+        self.origin = None
+        self._lock = threading.Lock()
+
+    def add(self, url, response):
+        parsed = urlparse(url)
+        body_name = "bodies/" + hashlib.sha1(url.encode("utf-8")).hexdigest()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+        with self._lock:
+            if self.origin is None:
+                self.origin = f"{parsed.scheme}://{parsed.netloc}"
+            if _key(url) in self.index:
+                return
+            self.zip.writestr(body_name, response.content)
+            self.index[_key(url)] = {
+                "url": url,
+                "status": response.status_code,
+                "headers": headers,
+                "body": body_name,
+            }
+
+    def close(self):
+        with self._lock:
+            self.zip.writestr("index.json", json.dumps({"origin": self.origin, "entries": self.index}))
+            self.zip.close()
+
+
+class ArchiveReader:
+
+    def __init__(self, path=ARCHIVE_PATH):
+        with zipfile.ZipFile(path) as archive:
+            meta = json.loads(archive.read("index.json"))
+            self.origin = meta["origin"]
+            self.entries = meta["entries"]
+            # small corpus: keep every body in memory so serving never touches the zip
+            self.bodies = {key: archive.read(entry["body"]) for key, entry in self.entries.items()}
+
+    def lookup(self, path):
+        entry = self.entries.get(path)
+        if entry is None:
+            return None
+        return entry, self.bodies[path]
+
+
+# replay: serve the archive locally, links rewritten to point back at us
+class ReplayServer(LocalServer):
+
+    class Handler(LocalHandler):
+
+        def do_GET(self):
+            server = self.owner
+            found = server.archive.lookup(self.path)
+            if found is None:
+                self.send_error(404)
+                return
+            entry, body = found
+            content_type = {k.lower(): v for k, v in entry["headers"].items()}.get("content-type", "text/html")
+            if "html" in content_type:
+                for live in server.origins:
+                    body = body.replace(live, server.url.encode())
+
+            if server.latency:
+                time.sleep(server.latency)
+            self.send_response(entry["status"])
+            for name, value in entry["headers"].items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self._write_body(body)
+
+        def _write_body(self, body):
+            bandwidth = self.owner.bandwidth
+            if not bandwidth:
+                self.wfile.write(body)
+                return
+            # throttle in 16KB chunks
+            chunk = 16 * 1024
+            for start in range(0, len(body), chunk):
+                part = body[start:start + chunk]
+                self.wfile.write(part)
+                time.sleep(len(part) / bandwidth)
+
+    def __init__(self, archive_path=ARCHIVE_PATH, profile="none", host="127.0.0.1", port=0):
+        self.archive = ArchiveReader(archive_path)
+        self.latency, self.bandwidth = PROFILES[profile]
+        live_host = urlparse(self.archive.origin).netloc
+        self.origins = [f"https://{live_host}".encode(), f"http://{live_host}".encode()]
+        super().__init__(host, port)
+
+    # the live BASE_URL, moved onto this server
+    def rewrite(self, url):
+        return self.url + _key(url)
+
+
+# crawl listing pages + articles once and store every response
+def record(base_url, pages, archive_path=ARCHIVE_PATH):
+    writer = ArchiveWriter(archive_path)
+    with Fetcher(recorder=writer) as fetcher:
+        page_urls = [base_url if page == 1 else f"{base_url}page/{page}/" for page in range(1, pages + 1)]
+        article_urls = []
+        for page, (url, response, error) in enumerate(fetcher.map(page_urls), start=1):
+            if error:
+                print(f"❌ Fail in Page {page} : {error}")
+                continue
+            links, _ = extract_links(response.text, page)
+            article_urls.extend(link["url"] for link in links)
+        for url, _, error in fetcher.map(article_urls):
+            if error:
+                print(f"❌ {url} : {error}")
+    writer.close()
+    print(f"Recorded {len(writer.index)} responses to {archive_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record the coffeereview crawl, or replay it from a local server.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record")
+    rec.add_argument("--base-url", default="https://www.coffeereview.com/category/articles/")
+    rec.add_argument("--pages", type=int, default=6)
+    rec.add_argument("--archive", default=ARCHIVE_PATH)
+
+    serve = sub.add_parser("serve")
+    serve.add_argument("--archive", default=ARCHIVE_PATH)
+    serve.add_argument("--profile", choices=PROFILES, default="none")
+    serve.add_argument("--port", type=int, default=8000)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.base_url, args.pages, args.archive)
+    else:
+        server = ReplayServer(args.archive, args.profile, port=args.port)
+        print(f"Replaying {len(server.archive.entries)} responses on {server.url} (profile: {args.profile})")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
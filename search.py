@@ -0,0 +1,193 @@
+import argparse
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from scipy import sparse
+
+from corpus_store import load_corpus
+from localserver import LocalHandler, LocalServer
+from textnorm import TFIDF_STOPWORDS, TextNormalizer
+from tfidf_model import MODEL_DIR, TfidfModel
+
+
+ARTICLES_PATH = "Articles_Coffee.csv"
+SEARCH_MODEL = "all"          # model under MODEL_DIR; the widest vocabulary
+BLOCK_ROWS = 50_000           # documents scored per sparse matmul block
+TOP_K = 10
+
+# per-query latency targets (ms), checked by the bench command
+LATENCY_TARGETS = {"term": 5, "search": 50, "similar": 50}
+
+
+# top-k (index, score) of a dense score vector, highest first
+def _top_k(scores, k):
+    if k >= len(scores):
+        order = np.argsort(-scores, kind="stable")
+    else:
+        picked = np.argpartition(-scores, k - 1)[:k]
+        order = picked[np.lexsort((picked, -scores[picked]))]
+    return [(int(i), float(scores[i])) for i in order if scores[i] > 0]
+
+
+# inverted index + cosine search over one fitted TF-IDF model
+class SearchIndex:
+
+    def __init__(self, model, titles=None, block_rows=BLOCK_ROWS):
+        self.model = model
+        self.block_rows = block_rows
+        # a streaming fit without MatrixWriter, or an empty corpus, would answer every query with nothing
+        if model.matrix is None or model.matrix.nnz == 0:
+            raise ValueError("TF-IDF model has no stored document-term matrix; refit it with Part02a_TF-IDF.py")
+        self.matrix = sparse.csr_matrix(model.matrix)
+        self.titles = list(titles) if titles is not None else None
+        if self.titles is not None and len(self.titles) != self.matrix.shape[0]:
+            raise ValueError(f"{len(self.titles)} titles for a model of {self.matrix.shape[0]} documents")
+
+        # postings: column j of the CSC matrix = (doc ids, weights) of term j
+        self.postings = self.matrix.tocsc()
+        self.postings.sort_indices()
+        self.terms = {term: j for j, term in enumerate(model.feature_names)}
+        # rows are l2-normalized by the vectorizer; kept general for other weightings
+        self.norms = np.sqrt(np.asarray(self.matrix.multiply(self.matrix).sum(axis=1)).ravel())
+        self.norms[self.norms == 0] = 1.0
+        self.normalizer = TextNormalizer(TFIDF_STOPWORDS)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    # postings list of one word or phrase, by weight
+    def lookup(self, term, k=TOP_K):
+        j = self.terms.get(self.normalizer.lemmatized(term))
+        if j is None:
+            return []
+        start, stop = self.postings.indptr[j], self.postings.indptr[j + 1]
+        docs = self.postings.indices[start:stop]
+        return [(int(docs[i]), score) for i, score in _top_k(np.asarray(self.postings.data[start:stop]), k)]
+
+    # cosine similarity of a query vector against every document, in row blocks
+    def _cosine(self, vector, k, exclude=None):
+        vector = sparse.csr_matrix(vector)
+        query_norm = np.sqrt(vector.multiply(vector).sum())
+        if query_norm == 0:
+            return []
+        best = []
+        for start in range(0, len(self), self.block_rows):
+            block = self.matrix[start:start + self.block_rows]
+            scores = np.asarray((block @ vector.T).todense()).ravel()
+            scores /= self.norms[start:start + block.shape[0]] * query_norm
+            if exclude is not None and start <= exclude < start + block.shape[0]:
+                scores[exclude - start] = 0
+            best.extend((start + i, score) for i, score in _top_k(scores, k))
+        best.sort(key=lambda hit: (-hit[1], hit[0]))
+        return best[:k]
+
+    # free-text query, normalized like the corpus
+    def search(self, query, k=TOP_K):
+        return self._cosine(self.model.transform([self.normalizer.lemmatized(query)]), k)
+
+    # articles most similar to article `doc` (0-based row)
+    def similar(self, doc, k=TOP_K):
+        if not 0 <= doc < len(self):
+            raise IndexError(f"No article {doc + 1}")
+        return self._cosine(self.matrix[doc], k, exclude=doc)
+
+    def describe(self, hits):
+        return [{"article_id": doc + 1,
+                 "title": self.titles[doc] if self.titles is not None else None,
+                 "score": round(score, 4)} for doc, score in hits]
+
+    # dispatch used by the CLI and the HTTP endpoint; returns (hits, latency ms)
+    def query(self, command, arg, k=TOP_K):
+        start = time.perf_counter()
+        if command == "term":
+            hits = self.lookup(arg, k)
+        elif command == "search":
+            hits = self.search(arg, k)
+        elif command == "similar":
+            hits = self.similar(int(arg) - 1, k)
+        else:
+            raise ValueError(f"Unknown command: {command}")
+        return self.describe(hits), 1000 * (time.perf_counter() - start)
+
+
+def load_index(model_dir=MODEL_DIR, model_name=SEARCH_MODEL, articles_path=ARTICLES_PATH):
+    model = TfidfModel.load(os.path.join(model_dir, model_name))
+    titles = load_corpus(articles_path, columns=["title"])["title"]
+    return SearchIndex(model, titles)
+
+
+class SearchServer(LocalServer):
+
+    # GET /term?q=cold+brew, /search?q=..., /similar?id=12  (&k=10)
+    class Handler(LocalHandler):
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            command = url.path.strip("/")
+            arg = (params.get("id") or params.get("q") or [""])[0]
+            try:
+                k = int(params.get("k", [TOP_K])[0])
+                hits, latency = self.owner.index.query(command, arg, k)
+            except (ValueError, IndexError) as e:
+                self.send_error(400, str(e))
+                return
+            self._json({"results": hits, "latency_ms": round(latency, 3)})
+
+    def __init__(self, index, host="127.0.0.1", port=0):
+        self.index = index
+        super().__init__(host, port)
+
+
+# p50/p99 per query type against LATENCY_TARGETS, on queries drawn from the index itself
+def bench(index, queries=200, k=TOP_K, seed=0):
+    rng = np.random.RandomState(seed)
+    terms = list(index.terms)
+    workloads = {
+        "term": [terms[i] for i in rng.randint(0, len(terms), queries)],
+        "search": [" ".join(terms[i] for i in rng.randint(0, len(terms), 3)) for _ in range(queries)],
+        "similar": [str(i + 1) for i in rng.randint(0, len(index), queries)],
+    }
+    report = {}
+    for command, args in workloads.items():
+        latencies = [index.query(command, arg, k)[1] for arg in args]
+        p50, p99 = np.percentile(latencies, [50, 99])
+        report[command] = {"p50_ms": float(p50), "p99_ms": float(p99),
+                           "target_ms": LATENCY_TARGETS[command], "ok": bool(p99 <= LATENCY_TARGETS[command])}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the articles with the saved TF-IDF model.")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--model", default=SEARCH_MODEL)
+    parser.add_argument("--articles", default=ARTICLES_PATH)
+    parser.add_argument("-k", type=int, default=TOP_K)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("term", help="articles containing a word or phrase").add_argument("text")
+    sub.add_parser("search", help="free-text cosine search").add_argument("text")
+    sub.add_parser("similar", help="articles similar to an article_id").add_argument("text")
+    sub.add_parser("serve", help="local HTTP endpoint").add_argument("--port", type=int, default=8001)
+    sub.add_parser("bench", help="p50/p99 latency per query type")
+    args = parser.parse_args()
+
+    index = load_index(args.model_dir, args.model, args.articles)
+    if args.command == "serve":
+        server = SearchServer(index, port=args.port)
+        print(f"Serving {len(index)} articles on {server.url} (/term?q=, /search?q=, /similar?id=)")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+    elif args.command == "bench":
+        for command, stats in bench(index, k=args.k).items():
+            status = "ok" if stats["ok"] else "OVER TARGET"
+            print(f"{command:8s} p50 {stats['p50_ms']:7.2f} ms   p99 {stats['p99_ms']:7.2f} ms   "
+                  f"target {stats['target_ms']} ms  {status}")
+    else:
+        hits, latency = index.query(args.command, args.text, args.k)
+        for hit in hits:
+            print(f"{hit['article_id']:6d}  {hit['score']:.4f}  {hit['title']}")
+        print(f"({len(hits)} results in {latency:.2f} ms)")
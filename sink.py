@@ -0,0 +1,124 @@
+import csv
+import json
+import os
+import shutil
+
+import pandas as pd
+
+
+FIELDS = ["title", "url", "date", "categories", "content", "source_page", "method"]
+FSYNC_EVERY = 50     # rows between fsyncs
+READ_CHUNKSIZE = 1000
+
+
+def _format(path):
+    return "jsonl" if path.endswith(".jsonl") else "csv"
+
+
+# streaming article writer: rows go to <path>.part as they arrive, and
+# close() swaps it over <path> atomically. A .part left behind by a crash
+# is picked up again on the next open, so written articles are never lost.
+class ArticleSink:
+
+    def __init__(self, path, append=True, fsync_every=FSYNC_EVERY):
+        self.path = path
+        self.tmp_path = path + ".part"
+        self.format = _format(path)
+        self.fsync_every = fsync_every
+        self.count = 0
+
+        if os.path.exists(self.tmp_path):
+            print(f"Recovering unfinished {self.tmp_path}")
+            self._trim_partial_row()
+        elif append and os.path.exists(path):
+            # renamed only once complete: a crash mid-copy must not leave a short .part to "recover"
+            copy_path = path + ".copy.part"
+            shutil.copyfile(path, copy_path)
+            os.replace(copy_path, self.tmp_path)
+
+        write_header = not os.path.exists(self.tmp_path) or os.path.getsize(self.tmp_path) == 0
+        self.file = open(self.tmp_path, "a", newline="", encoding="utf-8")
+        if self.format == "csv":
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS, extrasaction="ignore")
+            if write_header:
+                self.writer.writeheader()
+
+    # a crash mid-write can leave half a row at the end
+    def _trim_partial_row(self):
+        with open(self.tmp_path, "rb+") as f:
+            data = f.read()
+            if self.format == "csv":
+                # multi-line quoted content: only cut at a newline outside quotes
+                end = 0
+                quoted = False
+                for i, byte in enumerate(data):
+                    if byte == ord('"'):
+                        quoted = not quoted
+                    elif byte == ord("\n") and not quoted:
+                        end = i + 1
+            else:
+                end = data.rfind(b"\n") + 1
+            f.truncate(end)
+
+    def write(self, article):
+        if self.format == "csv":
+            self.writer.writerow(article)
+        else:
+            self.file.write(json.dumps(article, ensure_ascii=False) + "\n")
+        self.file.flush()
+        self.count += 1
+        if self.count % self.fsync_every == 0:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    # on error keep the .part file for recovery instead of finalizing
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+# one stream of articles to several writers
+class Tee:
+
+    def __init__(self, *writers):
+        self.writers = writers
+
+    def write(self, article):
+        for writer in self.writers:
+            writer.write(article)
+
+
+# swap a finished directory in over `path`; the previous one is only removed once replaced
+def swap_dir(tmp_path, path):
+    old_path = path + ".old"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+# lazy reading: one DataFrame chunk at a time
+def iter_articles(path, columns=None, chunksize=READ_CHUNKSIZE):
+    if _format(path) == "jsonl":
+        for chunk in pd.read_json(path, lines=True, chunksize=chunksize):
+            yield chunk[columns] if columns else chunk
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+# only the requested columns are ever kept in memory
+def read_articles(path, columns=None, chunksize=READ_CHUNKSIZE):
+    chunks = list(iter_articles(path, columns, chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=columns or FIELDS)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+import lda_models
+from lda_models import TopicState, document_keys, fit_lda, make_lda, word_perplexity
+from lda_select import _split_topics, warm_init
+from tfidf_model import count_vectorize
+
+
+@pytest.fixture
+def counts():
+    matrix = sparse.random(300, 80, density=0.08, random_state=0, format="csr")
+    matrix.data = np.ceil(matrix.data * 4)
+    return matrix
+
+
+def _assert_same_fit(lda, document_topics, reference, reference_topics):
+    np.testing.assert_array_equal(document_topics, reference_topics)
+    np.testing.assert_array_equal(lda.components_, reference.components_)
+    assert lda.bound_ == reference.bound_
+    assert lda.n_iter_ == reference.n_iter_
+    assert lda.n_batch_iter_ == reference.n_batch_iter_
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_fit_lda_matches_fit_transform(counts, n_jobs):
+    lda, document_topics = fit_lda(counts, 4, 0.5, n_jobs, max_iter=3)
+    assert lda_models.uses_internals(lda)
+    reference = make_lda(4, 0.5, n_jobs, max_iter=3)
+    _assert_same_fit(lda, document_topics, reference, reference.fit_transform(counts))
+
+
+def test_fit_lda_falls_back_outside_checked_releases(counts, monkeypatch):
+    monkeypatch.setattr(lda_models, "SKLEARN_INTERNALS", ((0, 1), (0, 1)))
+    lda, document_topics = fit_lda(counts, 4, max_iter=3)
+    reference = make_lda(4, max_iter=3)
+    _assert_same_fit(lda, document_topics, reference, reference.fit_transform(counts))
+
+
+def test_fit_lda_batch_learning_uses_fit_transform(counts, monkeypatch):
+    monkeypatch.setitem(lda_models.LDA_PARAMS, "learning_method", "batch")
+    lda, document_topics = fit_lda(counts, 4, max_iter=3)
+    assert lda.learning_method == "batch"
+    reference = make_lda(4, max_iter=3)
+    _assert_same_fit(lda, document_topics, reference, reference.fit_transform(counts))
+
+
+@pytest.mark.parametrize("releases", [None, ((0, 1), (0, 1))])
+def test_warm_start_matches_across_paths(counts, monkeypatch, releases):
+    fitted, _ = fit_lda(counts, 3, max_iter=2)
+    components = _split_topics(fitted.components_, 4)
+
+    def warm_fit():
+        lda = make_lda(4, max_iter=2)
+        lda.total_samples = counts.shape[0]
+        warm_init(lda, counts, components.copy())
+        lda.partial_fit(counts)
+        return lda
+
+    internals = warm_fit()
+    if releases:
+        monkeypatch.setattr(lda_models, "SKLEARN_INTERNALS", releases)
+    public = warm_fit()
+    assert lda_models.uses_internals(public) == (releases is None)
+    np.testing.assert_array_equal(public.components_, internals.components_)
+    np.testing.assert_array_equal(public.transform(counts), internals.transform(counts))
+    assert public.n_batch_iter_ == internals.n_batch_iter_
+
+
+def test_topic_state_baselines_match_retokenizing():
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(40)]
+    texts = [" ".join(rng.choice(words, 30)) for _ in range(60)]
+    configs = {'word': dict(max_features=25), 'phrase': dict(max_features=50, ngram_range=(2, 2))}
+    counts = count_vectorize(texts, configs)
+    models, vectorizers, topics = {}, {}, {}
+    for name, (features, matrix, _) in counts.items():
+        models[name], topics[name] = fit_lda(matrix, 3, max_iter=3)
+        vectorizers[name] = CountVectorizer(vocabulary=features, ngram_range=configs[name].get('ngram_range', (1, 1)))
+
+    state = TopicState(models.items(), vectorizers.items(), 3, 0.5, document_keys(texts), counts, topics)
+    for name, vectorizer in vectorizers.items():
+        perplexity = word_perplexity(models[name], vectorizer.transform(texts))
+        assert state.baseline[name]['perplexity'] == pytest.approx(perplexity, rel=1e-12)
+        assert state.baseline[name]['oov_share'] == pytest.approx(state.oov_share(name, texts), rel=1e-12)
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import nltk
+from nltk.stem import WordNetLemmatizer
+
+
+# stopwords used by Part02a (TF-IDF)
+TFIDF_STOPWORDS = frozenset([
+    'the', 'and', 'to', 'of', 'a', 'in', 'that', 'is', 'it', 'for', 'with', 'on', 'by',
+    'this', 'as', 'be', 'at', 'are', 'was', 'from', 'has', 'have', 'had', 'been', 'but',
+    'not', 'what', 'all', 'were', 'when', 'we', 'they', 'their', 'you', 'your', 'his',
+    'her', 'says', 'said', 'say', 'one', 'two', 'three', 'many', 'much', 'can', 'will',
+    'just', 'would', 'could', 'should', 'now', 'then', 'than', 'our', 'here', 'there', 'why',
+    'these', 'those', 'year', 'per', 'about', 'who', 'report', 'variety', 'notes', 'like', 'she', 'he',
+    'other', 'month', 'daddy',
+])
+
+# stopwords used by Part02c (LDA)
+LDA_STOPWORDS = TFIDF_STOPWORDS - {'other', 'month', 'daddy'}
+
+MIN_WORD_LEN = 3
+LEMMA_CACHE_SIZE = 50_000
+PREPROCESS_WORKERS = os.cpu_count() or 1   # 1 = serial
+CHUNK_SIZE = 500                           # documents per task
+
+# digits and punctuation go in one pass (same result as the two re.sub calls)
+_STRIP = re.compile(r'[0-9]+|[^\w\s]')
+
+
+# shared text normalization for the Part02 stages
+class TextNormalizer:
+
+    def __init__(self, stopwords, min_len=MIN_WORD_LEN, cache_size=LEMMA_CACHE_SIZE):
+        self.stopwords = frozenset(stopwords)
+        self.min_len = min_len
+        self.lemmatizer = WordNetLemmatizer()
+        # WordNet loads lazily on the first call; pay that here, not mid-corpus
+        self.lemmatizer.lemmatize("coffee")
+        self.lemmatize = lru_cache(maxsize=cache_size)(self.lemmatizer.lemmatize)
+
+    # lowercased, stripped, stopword-filtered tokens before lemmatization
+    def tokens(self, text):
+        if not isinstance(text, str):
+            return []
+        stopwords = self.stopwords
+        min_len = self.min_len
+        return [word for word in _STRIP.sub('', text.lower()).split()
+                if len(word) >= min_len and word not in stopwords]
+
+    # one pass -> (lemmatized text, raw text)
+    def normalize(self, text):
+        words = self.tokens(text)
+        lemmatize = self.lemmatize
+        return ' '.join([lemmatize(word) for word in words]), ' '.join(words)
+
+    def lemmatized(self, text):
+        return self.normalize(text)[0]
+
+    def cache_info(self):
+        return self.lemmatize.cache_info()
+
+
+# settings that decide the output; cached results are only reused under the same fingerprint
+def fingerprint(stopwords, min_len=MIN_WORD_LEN):
+    try:
+        from nltk.corpus import wordnet
+        wordnet_version = wordnet.get_version()
+    except LookupError:
+        wordnet_version = None
+    settings = {
+        "stopwords": sorted(stopwords),
+        "strip": _STRIP.pattern,
+        "min_len": min_len,
+        "nltk": nltk.__version__,
+        "wordnet": wordnet_version,
+    }
+    return hashlib.sha1(json.dumps(settings).encode("utf-8")).hexdigest()
+
+
+# one normalizer per worker process, built once by the pool initializer
+_worker_normalizer = None
+
+
+def _init_worker(stopwords, min_len, cache_size):
+    global _worker_normalizer
+    _worker_normalizer = TextNormalizer(stopwords, min_len, cache_size)
+
+
+def _normalize_with(normalizer, texts, raw):
+    if raw:
+        return [normalizer.normalize(text) for text in texts]
+    return [normalizer.lemmatized(text) for text in texts]
+
+
+def _normalize_chunk(texts, raw):
+    return _normalize_with(_worker_normalizer, texts, raw)
+
+
+# process pool of warmed-up normalizers, reusable across normalize_many calls
+# (one pool for a whole stream of chunks instead of one per call)
+def normalizer_pool(stopwords, workers=PREPROCESS_WORKERS, min_len=MIN_WORD_LEN, cache_size=LEMMA_CACHE_SIZE):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(frozenset(stopwords), min_len, cache_size))
+
+
+def _map_chunks(pool, texts, chunk_size, raw):
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    results = []
+    # map keeps chunk order
+    for part in pool.map(_normalize_chunk, chunks, [raw] * len(chunks)):
+        results.extend(part)
+    return results
+
+
+def _normalize_all(texts, stopwords, workers, chunk_size, raw, min_len, cache_size, pool=None):
+    if not texts:
+        return []
+    if pool is not None:
+        return _map_chunks(pool, texts, chunk_size, raw)
+    if workers <= 1 or len(texts) <= chunk_size:
+        return _normalize_with(TextNormalizer(stopwords, min_len, cache_size), texts, raw)
+
+    with normalizer_pool(stopwords, min(workers, -(-len(texts) // chunk_size)), min_len, cache_size) as pool:
+        return _map_chunks(pool, texts, chunk_size, raw)
+
+
+# normalize a whole column, in order; sharded over a process pool when large
+# raw=True -> [(lemmatized, raw)], raw=False -> [lemmatized]
+# with a PreprocessCache only new or changed documents are normalized;
+# pool: a normalizer_pool built with the same stopwords/min_len, used instead of a new one
+def normalize_many(texts, stopwords, workers=PREPROCESS_WORKERS, chunk_size=CHUNK_SIZE, raw=True,
+                   min_len=MIN_WORD_LEN, cache_size=LEMMA_CACHE_SIZE, cache=None, pool=None):
+    texts = list(texts)
+    if cache is None:
+        return _normalize_all(texts, stopwords, workers, chunk_size, raw, min_len, cache_size, pool)
+
+    settings = fingerprint(stopwords, min_len)
+    keys = [cache.key(settings, text) if isinstance(text, str) else None for text in texts]
+    results = cache.get_many({key for key in keys if key is not None})
+
+    # normalize each missing document once, even if it appears several times
+    missing = {key: text for key, text in zip(keys, texts) if key is not None and key not in results}
+    computed = _normalize_all(list(missing.values()), stopwords, workers, chunk_size, True, min_len, cache_size, pool)
+    new_entries = dict(zip(missing, computed))
+    cache.put_many(new_entries)
+    results.update(new_entries)
+
+    # non-text cells (NaN) normalize to empty strings
+    pairs = [results[key] if key is not None else ('', '') for key in keys]
+    return pairs if raw else [lemmatized for lemmatized, _ in pairs]
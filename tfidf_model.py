@@ -0,0 +1,292 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from array import array
+from numbers import Integral
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.preprocessing import normalize
+
+from keywords import keyword_table
+from sink import read_articles, swap_dir
+from textnorm import TFIDF_STOPWORDS, normalize_many
+
+
+MODEL_DIR = "Part02_TF-IDF_Result/model"
+FORMAT_VERSION = 1
+MATRIX_DTYPES = {"data": np.float64, "indices": np.int32}
+COPY_BLOCK = 1 << 22    # elements per copy when MatrixWriter finishes an array
+
+
+# fitted vocabulary + IDF + document-term matrix of one TfidfVectorizer setting
+# on disk, one directory:
+#   meta.json                       format version, parameters, matrix shape, fit time
+#   vocab.json                      feature names, column order
+#   idf.npy                         float64[features]
+#   data.npy, indices.npy, indptr.npy   CSR arrays of the l2-normalized tf-idf matrix
+# matrix is None for a streaming fit until MatrixWriter has stored it
+class TfidfModel:
+
+    def __init__(self, params, feature_names, idf, matrix, fitted_at=None):
+        self.params = dict(params)
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self.idf = np.asarray(idf)
+        self.matrix = matrix
+        self.fitted_at = fitted_at or time.time()
+        self._vectorizer = None
+
+    def get_feature_names_out(self):
+        return self.feature_names
+
+    # score new documents against the saved vocabulary and IDF, no refit
+    def transform(self, texts):
+        if self._vectorizer is None:
+            self._vectorizer = CountVectorizer(
+                vocabulary={term: i for i, term in enumerate(self.feature_names)},
+                ngram_range=tuple(self.params.get("ngram_range", (1, 1))),
+            )
+        counts = self._vectorizer.transform(texts)
+        return normalize(counts @ sparse.diags(self.idf), norm="l2", copy=False).tocsr()
+
+    def save(self, path):
+        if self.matrix is None:
+            raise ValueError("Model has no document-term matrix; write it with MatrixWriter while scoring")
+        tmp_path = path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        matrix = sparse.csr_matrix(self.matrix)
+        np.save(os.path.join(tmp_path, "data.npy"), matrix.data)
+        np.save(os.path.join(tmp_path, "indices.npy"), matrix.indices)
+        np.save(os.path.join(tmp_path, "indptr.npy"), matrix.indptr)
+        self._save_metadata(tmp_path, matrix.shape)
+        swap_dir(tmp_path, path)
+
+    # everything but the matrix arrays
+    def _save_metadata(self, tmp_path, shape):
+        np.save(os.path.join(tmp_path, "idf.npy"), self.idf)
+        with open(os.path.join(tmp_path, "vocab.json"), "w", encoding="utf-8") as f:
+            json.dump(list(self.feature_names), f)
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "params": self.params,
+            "shape": list(shape),
+            "fitted_at": self.fitted_at,
+        }
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    # arrays are memory-mapped unless mmap=False
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported TF-IDF model version: {meta['version']}")
+        with open(os.path.join(path, "vocab.json"), encoding="utf-8") as f:
+            feature_names = json.load(f)
+
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in ("data", "indices", "indptr", "idf")}
+        matrix = sparse.csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]),
+                                   shape=tuple(meta["shape"]), copy=False)
+        return cls(meta["params"], feature_names, arrays["idf"], matrix, meta["fitted_at"])
+
+
+# a model's document-term matrix written chunk by chunk, for fits that never hold it in memory:
+# the CSR arrays are appended as raw files and turned into .npy on close(), which also
+# saves the rest of the model and points model.matrix at the memory-mapped result
+class MatrixWriter:
+
+    def __init__(self, model, path):
+        self.model = model
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+
+        self.files = {name: open(os.path.join(self.tmp_path, f"{name}.raw"), "wb") for name in MATRIX_DTYPES}
+        self.indptr = array("q", [0])
+
+    def write(self, rows):
+        rows = sparse.csr_matrix(rows)
+        self.files["data"].write(rows.data.astype(MATRIX_DTYPES["data"]).tobytes())
+        self.files["indices"].write(rows.indices.astype(MATRIX_DTYPES["indices"]).tobytes())
+        self.indptr.extend((rows.indptr[1:] + self.indptr[-1]).tolist())
+
+    def close(self):
+        for name, f in self.files.items():
+            f.close()
+            raw_path = os.path.join(self.tmp_path, f"{name}.raw")
+            size = os.path.getsize(raw_path) // np.dtype(MATRIX_DTYPES[name]).itemsize
+            target = np.lib.format.open_memmap(os.path.join(self.tmp_path, f"{name}.npy"), mode="w+",
+                                               dtype=MATRIX_DTYPES[name], shape=(size,))
+            if size:
+                raw = np.memmap(raw_path, dtype=MATRIX_DTYPES[name], mode="r")
+                for start in range(0, size, COPY_BLOCK):
+                    target[start:start + COPY_BLOCK] = raw[start:start + COPY_BLOCK]
+                del raw
+            target.flush()
+            del target
+            os.remove(raw_path)
+        np.save(os.path.join(self.tmp_path, "indptr.npy"), np.frombuffer(self.indptr, dtype=np.int64))
+
+        self.model._save_metadata(self.tmp_path, (len(self.indptr) - 1, len(self.model.feature_names)))
+        swap_dir(self.tmp_path, self.path)
+        self.model.matrix = TfidfModel.load(self.path).matrix
+
+
+# sklearn's min_df/max_df/max_features pruning, as a column mask over a sorted vocabulary
+# dfs/tfs: document and total frequency of every term
+def _feature_mask(dfs, tfs, n_doc, max_df=1.0, min_df=1, max_features=None):
+    max_doc_count = max_df if isinstance(max_df, Integral) else max_df * n_doc
+    min_doc_count = min_df if isinstance(min_df, Integral) else min_df * n_doc
+    if max_doc_count < min_doc_count:
+        raise ValueError("max_df corresponds to < documents than min_df")
+
+    mask = (dfs <= max_doc_count) & (dfs >= min_doc_count)
+    if max_features is not None and mask.sum() > max_features:
+        keep = (-tfs[mask]).argsort()[:max_features]
+        limited = np.zeros(len(dfs), dtype=bool)
+        limited[np.where(mask)[0][keep]] = True
+        mask = limited
+    if not mask.any():
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    return mask
+
+
+# several CountVectorizer settings from one tokenization pass: the widest ngram_range is
+# counted once, then each setting keeps its own n-gram lengths and pruning;
+# returns {name: (feature_names, counts, n_tokens)}, counts identical to CountVectorizer(**params).fit_transform(texts)
+# and n_tokens the number of n-gram tokens in the setting's range before pruning
+def count_vectorize(texts, configs):
+    ranges = {name: tuple(params.get("ngram_range", (1, 1))) for name, params in configs.items()}
+    widest = (min(low for low, _ in ranges.values()), max(high for _, high in ranges.values()))
+    base = CountVectorizer(ngram_range=widest)
+    counts = base.fit_transform(list(texts)).tocsc()
+    features = base.get_feature_names_out()
+    lengths = np.array([term.count(" ") + 1 for term in features])
+    dfs = np.diff(counts.indptr)
+    tfs = np.asarray(counts.sum(axis=0)).ravel()
+
+    results = {}
+    for name, (low, high) in ranges.items():
+        params = configs[name]
+        in_range = np.where((lengths >= low) & (lengths <= high))[0]
+        mask = _feature_mask(dfs[in_range], tfs[in_range], counts.shape[0], params.get("max_df", 1.0),
+                             params.get("min_df", 1), params.get("max_features"))
+        columns = in_range[mask]
+        results[name] = (features[columns], counts[:, columns].tocsr(), int(tfs[in_range].sum()))
+    return results
+
+
+# several TfidfVectorizer settings from one tokenization pass;
+# each model is identical to TfidfVectorizer(**params).fit_transform(texts)
+def fit_models(texts, configs):
+    models = {}
+    for name, (features, counts, _) in count_vectorize(texts, configs).items():
+        params = dict(configs[name], ngram_range=list(configs[name].get("ngram_range", (1, 1))))
+        transformer = TfidfTransformer()
+        matrix = transformer.fit_transform(counts).tocsr()
+        models[name] = TfidfModel(params, features, transformer.idf_, matrix)
+    return models
+
+
+# document and total frequencies of every term, accumulated chunk by chunk
+class TermCounter:
+
+    def __init__(self, ngram_range=(1, 1)):
+        self.analyzer = CountVectorizer(ngram_range=tuple(ngram_range))
+        self.index = {}
+        self.dfs = []
+        self.tfs = []
+        self.n_doc = 0
+
+    def update(self, texts):
+        texts = list(texts)
+        self.n_doc += len(texts)
+        if not texts:
+            return
+        try:
+            counts = self.analyzer.fit_transform(texts).tocsc()
+        except ValueError:
+            return  # chunk without a single token
+        chunk_dfs = np.diff(counts.indptr).tolist()
+        chunk_tfs = np.asarray(counts.sum(axis=0)).ravel().tolist()
+        index, dfs, tfs = self.index, self.dfs, self.tfs
+        for term, df, tf in zip(self.analyzer.get_feature_names_out(), chunk_dfs, chunk_tfs):
+            i = index.get(term)
+            if i is None:
+                index[term] = len(dfs)
+                dfs.append(df)
+                tfs.append(tf)
+            else:
+                dfs[i] += df
+                tfs[i] += tf
+
+    # (terms, dfs, tfs) in sorted vocabulary order, as the vectorizers use
+    def totals(self):
+        terms = np.array(sorted(self.index), dtype=object)
+        order = np.array([self.index[term] for term in terms], dtype=np.int64)
+        return terms, np.array(self.dfs, dtype=np.int64)[order], np.array(self.tfs, dtype=np.int64)[order]
+
+
+# out-of-core fit: make_chunks() is called once and must yield lists of normalized texts;
+# returns the same vocabularies and IDF as fit_models, without matrices (score the rows with
+# transform in a second pass and store them with MatrixWriter)
+def fit_streaming(make_chunks, configs):
+    counters = {}
+    for params in configs.values():
+        ngram_range = tuple(params.get("ngram_range", (1, 1)))
+        counters.setdefault(ngram_range, TermCounter(ngram_range))
+    for texts in make_chunks():
+        texts = list(texts)
+        for counter in counters.values():
+            counter.update(texts)
+
+    models = {}
+    for name, params in configs.items():
+        ngram_range = tuple(params.get("ngram_range", (1, 1)))
+        counter = counters[ngram_range]
+        terms, dfs, tfs = counter.totals()
+        mask = _feature_mask(dfs, tfs, counter.n_doc, params.get("max_df", 1.0), params.get("min_df", 1),
+                             params.get("max_features"))
+        # TfidfTransformer's smoothed idf
+        idf = np.full(int(mask.sum()), counter.n_doc + 1, dtype=np.float64)
+        idf /= dfs[mask] + 1.0
+        np.log(idf, out=idf)
+        idf += 1.0
+        models[name] = TfidfModel(dict(params, ngram_range=list(ngram_range)), terms[mask], idf, None)
+    return models
+
+
+def save_models(models, model_dir=MODEL_DIR):
+    for name, model in models.items():
+        model.save(os.path.join(model_dir, name))
+
+
+def load_models(model_dir=MODEL_DIR, names=None, mmap=True):
+    names = names or sorted(entry for entry in os.listdir(model_dir)
+                            if os.path.exists(os.path.join(model_dir, entry, "meta.json")))
+    return {name: TfidfModel.load(os.path.join(model_dir, name), mmap) for name in names}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score new articles with a saved TF-IDF model (no refit).")
+    parser.add_argument("articles", help="article .csv/.jsonl to score")
+    parser.add_argument("output", help="keyword csv to write")
+    parser.add_argument("--model", default=os.path.join(MODEL_DIR, "per"))
+    parser.add_argument("--keywords", type=int, default=5)
+    args = parser.parse_args()
+
+    model = TfidfModel.load(args.model)
+    df = read_articles(args.articles, ["title", "content"])
+    matrix = model.transform(normalize_many(df["content"], TFIDF_STOPWORDS, raw=False))
+    keyword_table(matrix, model.feature_names, df["title"], args.keywords).to_csv(args.output, index=False)
+    print(f"Scored {matrix.shape[0]} articles with {args.model} ({len(model.feature_names)} features)")
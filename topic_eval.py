@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+TOP_N = 10   # terms per topic scored for coherence
+
+
+def top_terms(lda, top_n=TOP_N):
+    return np.argsort(-lda.components_, axis=1, kind="stable")[:, :top_n]
+
+
+# document co-occurrence counts of the given columns: binary X[:, columns]^T X[:, columns]
+def cooccurrence(matrix, columns):
+    binary = sparse.csc_matrix(matrix)[:, columns]
+    binary.data = np.ones_like(binary.data)
+    return (binary.T @ binary).toarray()
+
+
+# UMass and NPMI per topic from one co-occurrence product over the union of top terms.
+# UMass (Mimno et al.): mean over ranked pairs of log((D(w_i, w_j) + 1) / D(w_j)), w_j ranked higher
+# NPMI: mean over pairs of log(P(w_i, w_j) / P(w_i) P(w_j)) / -log P(w_i, w_j); -1 if never together
+def coherence(lda, matrix, top_n=TOP_N):
+    start = time.perf_counter()
+    top = top_terms(lda, top_n)
+    columns, positions = np.unique(top, return_inverse=True)
+    positions = positions.reshape(top.shape)
+    counts = cooccurrence(matrix, columns)
+    cooccurrence_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    n_docs = matrix.shape[0]
+    doc_freq = np.diag(counts).astype(np.float64)
+    lower, higher = np.tril_indices(top.shape[1], k=-1)   # higher-ranked term = smaller index
+    rows = []
+    for topic_idx, terms in enumerate(positions):
+        i, j = terms[lower], terms[higher]
+        joint = counts[i, j].astype(np.float64)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            umass = np.log((joint + 1) / doc_freq[j])
+            p_joint = joint / n_docs
+            pmi = np.log(p_joint / (doc_freq[i] / n_docs * doc_freq[j] / n_docs))
+            npmi = np.where(joint == 0, -1.0, np.where(p_joint == 1, 1.0, pmi / -np.log(p_joint)))
+
+        rows.append({
+            'topic_id': topic_idx + 1,
+            'umass': float(np.mean(umass)),   # vocabulary terms occur in at least one document
+            'npmi': float(np.mean(npmi)),
+        })
+    scoring_seconds = time.perf_counter() - start
+    return pd.DataFrame(rows), {'cooccurrence_seconds': cooccurrence_seconds, 'scoring_seconds': scoring_seconds,
+                                'terms': len(columns)}
+
+
+# coherence table for several named models + report text
+def evaluate_topics(named_models, top_n=TOP_N):
+    tables = []
+    text = f"=== Topic Coherence (top {top_n} terms) ===\n"
+    for name, (lda, matrix) in named_models.items():
+        table, timings = coherence(lda, matrix, top_n)
+        table.insert(0, 'model', name)
+        tables.append(table)
+
+        text += (f"\n{name.capitalize()} model: mean UMass {table['umass'].mean():.4f}, "
+                 f"mean NPMI {table['npmi'].mean():.4f}\n")
+        for row in table.itertuples():
+            text += f"  Topic #{row.topic_id}: UMass {row.umass:.4f}, NPMI {row.npmi:.4f}\n"
+        text += (f"  ({timings['terms']} terms, co-occurrence {timings['cooccurrence_seconds']:.3f}s, "
+                 f"scoring {timings['scoring_seconds']:.3f}s)\n")
+    return pd.concat(tables, ignore_index=True), text
@@ -0,0 +1,224 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from lda_models import LDA_STATE, TopicState
+from localserver import LocalHandler, LocalServer
+from sink import read_articles
+from textnorm import LDA_STOPWORDS, TextNormalizer
+
+
+MAX_BATCH = 64        # documents per model call
+MAX_WAIT_MS = 5       # how long the first request of a batch waits for company
+LATENCY_WINDOW = 10_000
+
+
+# raw article text -> combined word/phrase topic mixture, as analyze_document_topics sees it
+class TopicInference:
+
+    def __init__(self, state):
+        self.state = state
+        self.normalizer = TextNormalizer(LDA_STOPWORDS)
+        for lda in state.models.values():
+            lda.n_jobs = 1  # batches are small; worker start-up would dominate
+
+    def infer(self, texts):
+        clean = [self.normalizer.lemmatized(text) for text in texts]
+        topics = [lda.transform(self.state.vectorizers[name].transform(clean))
+                  for name, lda in self.state.models.items()]
+        return np.mean(topics, axis=0)
+
+    @staticmethod
+    def describe(document_topics):
+        results = []
+        for topic_dist in document_topics:
+            dominant_topic = int(topic_dist.argmax())
+            results.append({
+                'dominant_topic': dominant_topic + 1,
+                'dominant_topic_prob': float(topic_dist[dominant_topic]),
+                'topic_probs': [round(float(prob), 6) for prob in topic_dist],
+            })
+        return results
+
+
+# collects concurrent requests into one model call; one thread owns the models
+class MicroBatcher:
+
+    def __init__(self, inference, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.inference = inference
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self.documents = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # Future of the described results for `texts`
+    def submit(self, texts):
+        future = Future()
+        self.requests.put((list(texts), future, time.perf_counter()))
+        return future
+
+    def classify(self, texts):
+        return self.submit(texts).result()
+
+    def _run(self):
+        while True:
+            batch = [self.requests.get()]
+            size = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch:
+                try:
+                    item = self.requests.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            texts = [text for item_texts, _, _ in batch for text in item_texts]
+            try:
+                results = self.inference.describe(self.inference.infer(texts)) if texts else []
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+
+            done = time.perf_counter()
+            start = 0
+            with self._lock:
+                self.batch_sizes.append(len(texts))
+                self.documents += len(texts)
+                for item_texts, future, submitted in batch:
+                    self.latencies.append(1000 * (done - submitted))
+                    future.set_result(results[start:start + len(item_texts)])
+                    start += len(item_texts)
+
+    def stats(self):
+        with self._lock:
+            latencies = list(self.latencies)
+            batch_sizes = list(self.batch_sizes)
+            documents = self.documents
+        if not latencies:
+            return {"requests": 0, "documents": documents}
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {
+            "requests": len(latencies),
+            "documents": documents,
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "mean_batch": float(np.mean(batch_sizes)),
+            "docs_per_sec": documents / (time.perf_counter() - self.started),
+        }
+
+
+class TopicServer(LocalServer):
+
+    # POST /topics {"texts": [...]} -> {"results": [...]};  GET /stats
+    class Handler(LocalHandler):
+
+        def do_POST(self):
+            if self.path != "/topics":
+                self.send_error(404)
+                return
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                texts = payload["texts"]
+                if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                    raise ValueError("texts must be a list of strings")
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_error(400, str(e))
+                return
+            try:
+                results = self.owner.batcher.classify(texts)
+            except Exception as e:
+                self._json({"error": f"{type(e).__name__}: {e}"}, 500)
+                return
+            self._json({"results": results})
+
+        def do_GET(self):
+            if self.path != "/stats":
+                self.send_error(404)
+                return
+            self._json(self.owner.batcher.stats())
+
+    def __init__(self, batcher, host="127.0.0.1", port=0):
+        self.batcher = batcher
+        super().__init__(host, port)
+
+
+# concurrent single-article clients against the batcher; no requests without texts
+def bench(batcher, texts, clients=16, requests_per_client=50):
+    if not texts:
+        return batcher.stats()
+    rng = np.random.RandomState(0)
+
+    def client(seed):
+        picks = np.random.RandomState(seed).randint(0, len(texts), requests_per_client)
+        for i in picks:
+            batcher.classify([texts[i]])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, rng.randint(0, 1 << 30, clients)))
+    elapsed = time.perf_counter() - start
+    stats = batcher.stats()
+    stats["docs_per_sec"] = clients * requests_per_client / elapsed
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Topic inference over the saved LDA models.")
+    parser.add_argument("--state", default=LDA_STATE)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="local HTTP endpoint").add_argument("--port", type=int, default=8002)
+    classify = sub.add_parser("classify", help="topic mixture of every article in a file")
+    classify.add_argument("articles")
+    classify.add_argument("output")
+    sub.add_parser("bench", help="p50/p99 latency and throughput").add_argument("articles")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    batcher = MicroBatcher(TopicInference(TopicState.load(args.state)), args.max_batch, args.max_wait_ms)
+    print(f"Models loaded in {time.perf_counter() - start:.2f}s")
+
+    if args.command == "serve":
+        server = TopicServer(batcher, port=args.port)
+        print(f"Serving topics on {server.url} (POST /topics, GET /stats)")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        df = read_articles(args.articles, ["title", "content"])
+        texts = df["content"].fillna("").tolist()
+        if args.command == "classify":
+            futures = [batcher.submit(texts[i:i + args.max_batch]) for i in range(0, len(texts), args.max_batch)]
+            results = [result for future in futures for result in future.result()]
+            rows = []
+            for (idx, row), result in zip(df.iterrows(), results):
+                article_info = {'article_id': idx, 'title': row['title'],
+                                'dominant_topic': result['dominant_topic'],
+                                'dominant_topic_prob': result['dominant_topic_prob']}
+                for topic_idx, prob in enumerate(result['topic_probs']):
+                    article_info[f'topic_{topic_idx+1}_prob'] = prob
+                rows.append(article_info)
+            pd.DataFrame(rows).to_csv(args.output, index=False)
+        stats = bench(batcher, texts) if args.command == "bench" else batcher.stats()
+        if not stats["requests"]:
+            print(f"No articles in {args.articles}")
+        else:
+            print(f"{stats['documents']} documents, p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, "
+                  f"{stats['docs_per_sec']:.0f} docs/s, mean batch {stats['mean_batch']:.1f}")